@@ -0,0 +1,36 @@
+"""add turn timing to users
+
+Revision ID: c3e1f7a9d210
+Revises: b590c0703a2b
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e1f7a9d210'
+down_revision: Union[str, None] = 'b590c0703a2b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('eot_confidence_threshold', sa.Float(), nullable=True))
+    op.add_column('users', sa.Column('eot_min_silence_ms', sa.Integer(), nullable=True))
+    op.add_column('users', sa.Column('eot_max_silence_ms', sa.Integer(), nullable=True))
+    op.add_column('users', sa.Column('turn_timing_override', sa.Boolean(), nullable=False, server_default=sa.false()))
+    op.add_column('users', sa.Column('turn_timing_stats', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'turn_timing_stats')
+    op.drop_column('users', 'turn_timing_override')
+    op.drop_column('users', 'eot_max_silence_ms')
+    op.drop_column('users', 'eot_min_silence_ms')
+    op.drop_column('users', 'eot_confidence_threshold')
@@ -0,0 +1,90 @@
+"""split user_info into one row per fact
+
+Revision ID: d4a8b2c6e913
+Revises: c3e1f7a9d210
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+import re
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a8b2c6e913'
+down_revision: Union[str, None] = 'c3e1f7a9d210'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# facts were appended without a separator ("User is Ali.User likes tea")
+_FACT_BOUNDARY = re.compile(r"(?<=[.!?])\s*(?=[A-Z])")
+_ABBREVIATION = re.compile(r"\b(St|Mr|Mrs|Ms|Dr|Jr|Sr|Prof|Mt|Ave|Inc|Co|Ltd|[A-Z])\.$")
+
+
+def _split_facts(blob: str):
+    facts = []
+    for piece in _FACT_BOUNDARY.split(blob):
+        piece = piece.strip()
+        if facts and _ABBREVIATION.search(facts[-1]):
+            facts[-1] = f"{facts[-1]} {piece}"
+        elif piece:
+            facts.append(piece)
+    return facts
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    blobs = []
+    # the blob table predates the migration history; it may or may not exist
+    if sa.inspect(conn).has_table('user_info'):
+        blobs = conn.execute(sa.text(
+            "SELECT b.user_id, b.info FROM user_info b JOIN users u ON u.id = b.user_id")).fetchall()
+        op.drop_table('user_info')
+
+    user_info = op.create_table(
+        'user_info',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('info', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_user_info_id'), 'user_info', ['id'], unique=False)
+    op.create_index(op.f('ix_user_info_user_id'), 'user_info', ['user_id'], unique=False)
+
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    rows = []
+    for user_id, blob in blobs:
+        seen = set()
+        for fact in _split_facts(blob or ""):
+            if fact.lower() not in seen:
+                seen.add(fact.lower())
+                rows.append({"user_id": user_id, "info": fact, "created_at": now, "updated_at": now})
+    if rows:
+        op.bulk_insert(user_info, rows)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    conn = op.get_bind()
+    blobs = {}
+    for user_id, info in conn.execute(sa.text("SELECT user_id, info FROM user_info ORDER BY id")):
+        blobs[user_id] = f"{blobs[user_id]} {info}" if user_id in blobs else info
+    op.drop_index(op.f('ix_user_info_user_id'), table_name='user_info')
+    op.drop_index(op.f('ix_user_info_id'), table_name='user_info')
+    op.drop_table('user_info')
+    user_info = op.create_table(
+        'user_info',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('info', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('user_id'),
+    )
+    op.create_index(op.f('ix_user_info_user_id'), 'user_info', ['user_id'], unique=False)
+    if blobs:
+        op.bulk_insert(user_info, [{"user_id": k, "info": v} for k, v in blobs.items()])
@@ -0,0 +1,127 @@
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+from app.agent import metrics
+
+
+class AudioEgress:
+    """
+    Per-session audio path to the ASR: submit() queues a frame and returns
+    immediately; a dedicated thread drains the queue into `send` (e.g.
+    StreamingClient.stream), so a slow ASR socket never blocks the event
+    loop. bytes frames (the packetizer output) are queued as they are; other
+    buffers (VAD pre-roll views) are copied once, since they get reused.
+
+    When all `max_slots` entries are queued the newest entry absorbs the
+    frame if it stays under `slot_bytes` (fewer, larger sends); otherwise
+    the oldest queued audio is dropped, keeping latency bounded instead of
+    memory growing.
+    """
+
+    def __init__(self, send: Callable[[bytes], None], max_slots: int = 50,
+                 slot_bytes: int = 12800, name: str = "audio-egress"):
+        self._send = send
+        self.slot_bytes = slot_bytes
+        self.max_slots = max_slots
+        self._queue = deque()  # (payload bytes, enqueued_at)
+        self._cond = threading.Condition()
+        self._closed = False
+
+        self.frames_submitted = 0
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.frames_merged = 0
+        self.frames_dropped = 0
+        self.bytes_dropped = 0
+        self.send_errors = 0
+        self._send_ms = deque(maxlen=256)
+        self._queue_wait_ms = deque(maxlen=256)
+
+        self._thread = threading.Thread(target=self._drain, name=name, daemon=True)
+        self._thread.start()
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def submit(self, data) -> None:
+        """Queue bytes-like audio for sending; never blocks on the network."""
+        if type(data) is not bytes:
+            data = bytes(data)
+        if len(data) <= self.slot_bytes:
+            self._submit_one(data)
+            return
+        view = memoryview(data)
+        for offset in range(0, len(view), self.slot_bytes):
+            self._submit_one(bytes(view[offset:offset + self.slot_bytes]))
+
+    def _submit_one(self, payload: bytes) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            self.frames_submitted += 1
+
+            if len(self._queue) >= self.max_slots:
+                last, enqueued_at = self._queue[-1]
+                if len(last) + len(payload) <= self.slot_bytes:
+                    self._queue[-1] = (last + payload, enqueued_at)
+                    self.frames_merged += 1
+                    metrics.incr("asr_frames_merged")
+                    self._cond.notify()
+                    return
+                dropped, _ = self._queue.popleft()
+                self.frames_dropped += 1
+                self.bytes_dropped += len(dropped)
+                metrics.incr("asr_frames_dropped")
+
+            self._queue.append((payload, time.monotonic()))
+            self._cond.notify()
+
+    def _drain(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                payload, enqueued_at = self._queue.popleft()
+                size = len(payload)
+
+            started = time.monotonic()
+            self._queue_wait_ms.append((started - enqueued_at) * 1000)
+            try:
+                self._send(payload)
+                self.frames_sent += 1
+                self.bytes_sent += size
+            except Exception as e:
+                self.send_errors += 1
+                print(f"Error streaming audio chunk: {e}")
+            send_ms = (time.monotonic() - started) * 1000
+            self._send_ms.append(send_ms)
+            metrics.observe("asr_send_ms", send_ms)
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Stop accepting audio, let queued audio drain (bounded by timeout)."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        send_ms = sorted(self._send_ms)
+        wait_ms = sorted(self._queue_wait_ms)
+        return {
+            "queue_depth": self.depth,
+            "frames_submitted": self.frames_submitted,
+            "frames_sent": self.frames_sent,
+            "bytes_sent": self.bytes_sent,
+            "frames_merged": self.frames_merged,
+            "frames_dropped": self.frames_dropped,
+            "bytes_dropped": self.bytes_dropped,
+            "send_errors": self.send_errors,
+            "send_ms_p50": round(send_ms[len(send_ms) // 2], 2) if send_ms else 0.0,
+            "send_ms_max": round(send_ms[-1], 2) if send_ms else 0.0,
+            "queue_wait_ms_p50": round(wait_ms[len(wait_ms) // 2], 2) if wait_ms else 0.0,
+        }
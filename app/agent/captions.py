@@ -0,0 +1,127 @@
+import asyncio
+import json
+import time
+from typing import Optional
+
+from fastapi.websockets import WebSocketState
+
+from app.agent import metrics
+
+
+def _common_prefix(a: str, b: str) -> int:
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+
+class CaptionEmitter:
+    """
+    Per-session sender for live asr_partial captions.
+
+    Partials are coalesced: at most `max_hz` captions go out per second and
+    only the newest text is sent. While a caption send is still in flight
+    (the client or network is slow to drain), newer partials just replace
+    the pending one. In delta mode a caption carries only what changed:
+    {"type": "asr_partial", "keep": <chars of the previous caption kept>,
+    "append": <new suffix>}; otherwise the full text as before.
+    """
+
+    def __init__(self, websocket, max_hz: float = 8.0, delta: bool = False):
+        self._websocket = websocket
+        self.interval = 1.0 / max_hz if max_hz > 0 else 0.0
+        self.delta = delta
+
+        self._pending: Optional[str] = None
+        # what the client is known to show: advanced only after a send succeeded
+        self._sent_text = ""
+        self._generation = 0  # bumped by reset(); a send from an earlier turn must not move _sent_text
+        self._last_send_at = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._sending: Optional[asyncio.Task] = None
+
+        self.partials = 0
+        self.sent = 0
+        self.coalesced = 0
+        self.backpressured = 0
+        self.bytes_sent = 0
+
+    def push(self, text: str) -> None:
+        """Offer the newest partial; it goes out now, later, or is replaced by a newer one."""
+        self.partials += 1
+        if self._pending is not None:
+            self.coalesced += 1
+            metrics.incr("captions_coalesced")
+        self._pending = text
+        self._schedule()
+
+    def reset(self) -> None:
+        """The turn ended: drop any unsent partial and start the next caption from scratch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._pending = None
+        self._sent_text = ""
+        self._generation += 1
+
+    def _schedule(self) -> None:
+        if self._timer is not None:
+            return
+        if self._sending is not None and not self._sending.done():
+            # picked up by _sent() once the current send drains
+            self.backpressured += 1
+            metrics.incr("captions_backpressured")
+            return
+        wait = self._last_send_at + self.interval - time.monotonic()
+        if wait > 0:
+            self._timer = asyncio.get_running_loop().call_later(wait, self._fire)
+        else:
+            self._fire()
+
+    def _fire(self) -> None:
+        self._timer = None
+        text, self._pending = self._pending, None
+        if text is None or text == self._sent_text:
+            return
+        if self.delta:
+            keep = _common_prefix(self._sent_text, text)
+            payload = {"type": "asr_partial", "keep": keep, "append": text[keep:]}
+        else:
+            payload = {"type": "asr_partial", "text": text}
+        self._last_send_at = time.monotonic()
+        self._sending = asyncio.create_task(self._send(json.dumps(payload), text, self._generation))
+
+    async def _send(self, message: str, text: str, generation: int) -> None:
+        try:
+            if self._websocket.client_state == WebSocketState.CONNECTED:
+                await self._websocket.send_text(message)
+                self.sent += 1
+                self.bytes_sent += len(message)
+                metrics.incr("captions_sent")
+                if generation == self._generation:
+                    self._sent_text = text
+        except Exception:
+            # the client may hold a partial or no update: the next delta resends the full text
+            if generation == self._generation:
+                self._sent_text = ""
+            metrics.incr("caption_send_errors")
+        finally:
+            self._sending = None
+            if self._pending is not None:
+                self._schedule()
+
+    def close(self) -> None:
+        self.reset()
+        if self._sending is not None:
+            self._sending.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "partials": self.partials,
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+            "backpressured": self.backpressured,
+            "bytes_sent": self.bytes_sent,
+            "delta": self.delta,
+        }
@@ -0,0 +1,200 @@
+import asyncio
+import json
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from app.config import settings
+from app.agent import metrics
+from app.core.http_clients import openai_client
+
+# gpt-4o / gpt-4o-mini tokenizer; loaded off the event loop (first use downloads it)
+TOKENIZER_ENCODING = "o200k_base"
+MESSAGE_OVERHEAD_TOKENS = 4
+MAX_SUMMARY_CHARS = 1500
+DIGEST_FIELDS = ("id", "title", "name", "content", "due_date", "priority", "status", "project_id")
+
+_encoding = None
+
+
+def load_tokenizer() -> None:
+    """Load the tiktoken encoding; until it is loaded, counts are estimated."""
+    global _encoding
+    try:
+        import tiktoken
+        _encoding = tiktoken.get_encoding(TOKENIZER_ENCODING)
+    except Exception as e:
+        print(f"Tokenizer unavailable, estimating token counts: {e}")
+
+
+def count_text_tokens(text: str) -> int:
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+def count_message_tokens(message: Any) -> int:
+    content = message.content if isinstance(message.content, str) else json.dumps(message.content)
+    tokens = MESSAGE_OVERHEAD_TOKENS + count_text_tokens(content)
+    for call in getattr(message, "tool_calls", None) or []:
+        tokens += count_text_tokens(call.get("name", "")) + count_text_tokens(json.dumps(call.get("args", {})))
+    return tokens
+
+
+def _digest_value(value: Any, depth: int = 0) -> Any:
+    if depth > 3:
+        return "..."
+    if isinstance(value, list):
+        sample = [_digest_value(v, depth + 1) for v in value[:3]]
+        return {"count": len(value), "first": sample} if len(value) > 3 else sample
+    if isinstance(value, dict):
+        # list items keep only their identifying fields
+        kept = {k: value[k] for k in DIGEST_FIELDS if k in value} if depth > 1 else None
+        return kept or {k: _digest_value(v, depth + 1) for k, v in list(value.items())[:8]}
+    if isinstance(value, str) and len(value) > 120:
+        return value[:117] + "..."
+    return value
+
+
+def digest_tool_content(content: str, max_chars: int) -> str:
+    """Compact stand-in for an old tool result: counts and a few items instead of everything."""
+    if len(content) <= max_chars:
+        return content
+    try:
+        digest = json.dumps(_digest_value(json.loads(content)), default=str)
+    except (ValueError, TypeError):
+        digest = content
+    if len(digest) > max_chars:
+        digest = digest[:max_chars - 15] + " ...[truncated]"
+    return digest
+
+
+def _split_turns(messages: List[Any]) -> List[List[Any]]:
+    """Group messages into turns, each starting at a HumanMessage."""
+    turns: List[List[Any]] = []
+    for message in messages:
+        if isinstance(message, HumanMessage) or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+def _digest_turn(turn: List[Any], max_chars: int) -> List[Any]:
+    digested = []
+    for message in turn:
+        if isinstance(message, ToolMessage) and isinstance(message.content, str) \
+                and len(message.content) > max_chars:
+            message = ToolMessage(content=digest_tool_content(message.content, max_chars),
+                                  tool_call_id=message.tool_call_id, name=message.name)
+            metrics.incr("tool_messages_digested")
+        digested.append(message)
+    return digested
+
+
+def compact_conversation(session: Dict[str, Any], messages: List[Any],
+                         token_budget: Optional[int] = None) -> List[Any]:
+    """
+    Fit the conversation into a token budget for the next turn.
+
+    System messages are dropped (rebuilt every turn), tool results are
+    replaced by digests once they age out of the newest
+    JARVIS_TOOL_DIGEST_KEEP_TURNS turns (follow-ups like "what's the third
+    one?" need the full result), and whole turns that no longer fit are
+    handed to the background summarizer. The latest turn is always kept.
+    """
+    budget = token_budget or settings.JARVIS_HISTORY_TOKEN_BUDGET
+    turns = _split_turns([m for m in messages if not isinstance(m, SystemMessage)])
+    if not turns:
+        return []
+
+    digest_chars = settings.JARVIS_TOOL_DIGEST_CHARS
+    recent = max(1, settings.JARVIS_TOOL_DIGEST_KEEP_TURNS)
+    turns = [t if i >= len(turns) - recent else _digest_turn(t, digest_chars)
+             for i, t in enumerate(turns)]
+
+    kept: List[List[Any]] = []
+    used = 0
+    for i, turn in enumerate(reversed(turns)):
+        cost = sum(count_message_tokens(m) for m in turn)
+        if kept and used + cost > budget and i < recent:
+            # a recent turn that does not fit in full may still fit as a digest
+            turn = _digest_turn(turn, digest_chars)
+            cost = sum(count_message_tokens(m) for m in turn)
+        if kept and used + cost > budget:
+            break
+        kept.append(turn)
+        used += cost
+    kept.reverse()
+
+    overflow = turns[:len(turns) - len(kept)]
+    if overflow:
+        schedule_summary(session, [m for t in overflow for m in t])
+    metrics.observe("history_tokens", used)
+    return [m for t in kept for m in t]
+
+
+def _summary_lines(messages: List[Any]) -> List[str]:
+    lines = []
+    for message in messages:
+        if isinstance(message, HumanMessage):
+            lines.append(f"User: {message.content}")
+        elif isinstance(message, AIMessage) and message.content:
+            lines.append(f"Jarvis: {message.content}")
+        elif isinstance(message, ToolMessage):
+            lines.append(f"({message.name or 'tool'} result: {digest_tool_content(str(message.content), 200)})")
+    return lines
+
+
+def schedule_summary(session: Dict[str, Any], messages: List[Any]) -> None:
+    """Queue evicted messages for the rolling summary; at most one summarizer runs per session."""
+    session.setdefault("summary_backlog", []).extend(_summary_lines(messages))
+    task = session.get("summary_task")
+    if task is None or task.done():
+        session["summary_task"] = asyncio.create_task(_summarize(session))
+
+
+async def _summarize(session: Dict[str, Any]) -> None:
+    while session.get("summary_backlog"):
+        lines, session["summary_backlog"] = session["summary_backlog"], []
+        previous = session.get("conversation_summary", "")
+        try:
+            resp = await openai_client().chat.completions.create(
+                model=settings.JARVIS_SUMMARY_MODEL,
+                messages=[
+                    {"role": "system", "content": (
+                        "You maintain a running summary of a voice assistant conversation. "
+                        "Merge the new exchanges into the summary. Keep facts, decisions, "
+                        "task names and times; drop small talk. At most 6 short sentences.")},
+                    {"role": "user", "content": f"Summary so far:\n{previous or '(none)'}\n\n"
+                                                f"New exchanges:\n" + "\n".join(lines)},
+                ],
+                temperature=0.2,
+                max_tokens=250,
+            )
+            summary = (resp.choices[0].message.content or "").strip()
+            metrics.incr("history_summaries")
+        except Exception as e:
+            print(f"Error summarizing conversation: {e}")
+            metrics.incr("history_summary_errors")
+            # keep the raw lines rather than losing the context
+            summary = f"{previous} {' '.join(lines)}".strip()
+        session["conversation_summary"] = summary[-MAX_SUMMARY_CHARS:]
+
+
+def format_summary_block(session: Dict[str, Any]) -> str:
+    summary = session.get("conversation_summary")
+    if not summary:
+        return ""
+    return f"\n## Earlier In This Conversation\n{summary}\n"
+
+
+async def close_session_memory(session: Dict[str, Any]) -> None:
+    task = session.get("summary_task")
+    if task is not None and not task.done():
+        task.cancel()
+        try:
+            await task
+        except (asyncio.CancelledError, Exception):
+            pass
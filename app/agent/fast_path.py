@@ -0,0 +1,144 @@
+import re
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.agent import metrics
+
+# A handler gets the tool map and the regex match and returns
+# {"text": <spoken reply>, ...extra chunk fields} or None to fall through.
+FastPathHandler = Callable[[Dict[str, Any], "re.Match"], Awaitable[Optional[dict]]]
+
+_routes: List[Tuple[str, "re.Pattern", FastPathHandler]] = []
+
+_FILLER = re.compile(r"^(hey |hi |ok |okay )?(jarvis[, ]*)?(please |can you |could you )?")
+_PUNCT = re.compile(r"[^a-z0-9' ]+")
+
+
+def register_route(name: str, patterns: List[str], handler: FastPathHandler) -> None:
+    """Add a route; patterns are matched (fullmatch) against the normalized transcript."""
+    for pattern in patterns:
+        _routes.append((name, re.compile(pattern), handler))
+
+
+def fast_path_route(name: str, *patterns: str):
+    def decorator(handler: FastPathHandler) -> FastPathHandler:
+        register_route(name, list(patterns), handler)
+        return handler
+    return decorator
+
+
+def normalize(transcript: str) -> str:
+    text = _PUNCT.sub(" ", transcript.lower())
+    text = " ".join(text.split())
+    text = _FILLER.sub("", text)
+    return re.sub(r" please$", "", text).strip()
+
+
+def match_route(transcript: str) -> Optional[Tuple[str, FastPathHandler, "re.Match"]]:
+    text = normalize(transcript)
+    for name, pattern, handler in _routes:
+        match = pattern.fullmatch(text)
+        if match:
+            return name, handler, match
+    return None
+
+
+async def try_fast_path(transcript: str, tools_by_name: Dict[str, Any]) -> Optional[dict]:
+    """
+    Answer trivial commands without the LLM. Returns the reply payload
+    (with "route" set) or None when the turn should go to the agent graph.
+    """
+    started = time.perf_counter()
+    found = match_route(transcript)
+    reply = None
+    if found:
+        name, handler, match = found
+        try:
+            reply = await handler(tools_by_name, match)
+        except Exception as e:
+            print(f"Fast path {name} failed, falling back to agent: {e}")
+            reply = None
+
+    if not reply:
+        metrics.incr("fast_path_misses")
+        return None
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    metrics.incr("fast_path_hits")
+    metrics.incr(f"fast_path_hits.{name}")
+    metrics.observe("fast_path_ms", elapsed_ms)
+    # saved = what a graph turn currently costs minus what this one cost
+    graph_turn_ms = metrics.snapshot()["samples"].get("turn_total_ms", {}).get("avg")
+    if graph_turn_ms:
+        metrics.observe("fast_path_saved_ms", max(0.0, graph_turn_ms - elapsed_ms))
+    reply["route"] = name
+    return reply
+
+
+def stats() -> dict:
+    counters = metrics.snapshot()["counters"]
+    hits = counters.get("fast_path_hits", 0)
+    misses = counters.get("fast_path_misses", 0)
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / total, 3) if total else 0.0,
+    }
+
+
+def _spoken_time(local_time: str) -> Optional[str]:
+    try:
+        parsed = datetime.strptime(local_time, "%Y-%m-%d %H:%M:%S")
+    except (TypeError, ValueError):
+        return None
+    return parsed.strftime("%I:%M %p").lstrip("0")
+
+
+@fast_path_route(
+    "time",
+    r"(what'?s|what is) the (current )?time( now| right now)?",
+    r"what time is it( now| right now)?",
+    r"(tell me )?the time",
+)
+async def _time_route(tools_by_name: Dict[str, Any], match) -> Optional[dict]:
+    result = await tools_by_name["get_current_time"].ainvoke({})
+    spoken = _spoken_time(result.get("local_time"))
+    if spoken:
+        return {"text": f"It's {spoken} right now."}
+    utc_spoken = result.get("utc_time", "").split(" ")[1:2]
+    if not utc_spoken:
+        return None
+    return {"text": f"It's {utc_spoken[0][:5]} UTC right now."}
+
+
+@fast_path_route(
+    "standby",
+    r"(go to |enter |switch to )?(standby|sleep)( mode)?( now)?",
+    r"(stop listening|go quiet|be quiet)( now)?",
+)
+async def _standby_route(tools_by_name: Dict[str, Any], match) -> Optional[dict]:
+    result = await tools_by_name["send_to_standby"].ainvoke({})
+    return {"text": result["spoken_response"], "standby": True}
+
+
+@fast_path_route(
+    "pending_tasks",
+    # no date qualifiers ("for today"): the route lists pending tasks of any date
+    r"(list|show|read|tell me|what are|what's|whats)( me)?( all)? my (pending |open |remaining )?(tasks|to dos|todos)",
+    r"what (tasks )?do i (still )?have (to do|pending|left)",
+)
+async def _pending_tasks_route(tools_by_name: Dict[str, Any], match) -> Optional[dict]:
+    result = await tools_by_name["get_tasks_of_the_user"].ainvoke({"type": "pending", "limit": 5})
+    if result.get("status") != "success":
+        return None
+    tasks = [t.get("content") for t in result.get("tasks", []) if t.get("content")]
+    total = result.get("total", len(tasks))
+    if not tasks:
+        return {"text": "You don't have any pending tasks right now."}
+    if total == 1:
+        return {"text": f"You've got one pending task: {tasks[0]}."}
+    spoken = ", ".join(tasks[:-1]) + f", and {tasks[-1]}"
+    more = f" There are {total - len(tasks)} more." if total > len(tasks) else ""
+    return {"text": f"You've got {total} pending tasks: {spoken}.{more}"}
@@ -0,0 +1,54 @@
+import threading
+from collections import defaultdict, deque
+from typing import Dict
+
+# Rolling window of samples kept per metric
+MAX_SAMPLES = 1024
+
+_lock = threading.Lock()
+_counters: Dict[str, int] = defaultdict(int)
+_samples: Dict[str, deque] = defaultdict(lambda: deque(maxlen=MAX_SAMPLES))
+
+
+def incr(name: str, amount: int = 1) -> None:
+    """Increment a process-wide counter."""
+    with _lock:
+        _counters[name] += amount
+
+
+def observe(name: str, value: float) -> None:
+    """Record one sample (e.g. a latency in ms) for a rolling metric."""
+    with _lock:
+        _samples[name].append(float(value))
+
+
+def _percentile(values, q: float) -> float:
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(round(q * (len(values) - 1))))
+    return round(values[index], 2)
+
+
+def snapshot() -> dict:
+    """Return counters and p50/p95/p99 of every rolling metric."""
+    with _lock:
+        counters = dict(_counters)
+        samples = {name: sorted(values) for name, values in _samples.items()}
+
+    summaries = {}
+    for name, values in samples.items():
+        summaries[name] = {
+            "count": len(values),
+            "avg": round(sum(values) / len(values), 2) if values else 0.0,
+            "p50": _percentile(values, 0.50),
+            "p95": _percentile(values, 0.95),
+            "p99": _percentile(values, 0.99),
+            "max": round(values[-1], 2) if values else 0.0,
+        }
+    return {"counters": counters, "samples": summaries}
+
+
+def reset() -> None:
+    with _lock:
+        _counters.clear()
+        _samples.clear()
@@ -0,0 +1,190 @@
+import json
+import re
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from langchain_core.messages import AIMessage, ToolMessage
+
+from app.config import settings
+from app.agent import metrics
+
+TIERS = ("light", "default", "strong")
+
+_PLANNING = re.compile(
+    r"\b(plan|planning|organi[sz]e|prioriti[sz]e|break (it|this|that) down|figure out|"
+    r"reschedule (all|everything)|my (whole )?week|step by step|compare|pros and cons)\b")
+_MULTI_INTENT = re.compile(r"\b(and then|also|after that|as well)\b|,? and (add|create|tell|remind|mark|move|check)\b")
+# changes the model may still have to make after looking something up
+_WRITE_INTENT = re.compile(
+    r"\b(add|put|create|complete|finish|mark|move|postpone|reschedule|cancel|delete|update|change|rename|set)\b")
+# the whole turn is a greeting or thanks; confirmations ("yes", "ok", "do it") are not
+_SMALLTALK = re.compile(
+    r"(hi|hello|hey)( there)?|good (morning|afternoon|evening|night)|"
+    r"thanks?( you)?( so much| very much| a lot)?|how are you( doing)?( today)?|"
+    r"nice to (meet|see|hear from) you")
+_NORMALIZE = re.compile(r"[^a-z' ]+")
+
+# Tools that may be a lookup before a write ("mark my dentist task done"):
+# their result is only final when the turn asks for no change
+LOOKUP_TOOLS = frozenset({"get_tasks_of_the_user", "get_current_user_projects"})
+
+
+class Route(NamedTuple):
+    tier: str  # "template", or a model tier from TIERS
+    reason: str
+
+
+# Spoken confirmations for write tools, used instead of an LLM call to verbalize
+# their result: tool name -> (result dict -> text, or None to let the model answer)
+PostToolTemplate = Callable[[Dict[str, Any]], Optional[str]]
+POST_TOOL_TEMPLATES: Dict[str, PostToolTemplate] = {}
+
+
+def post_tool_template(name: str):
+    def decorator(fn: PostToolTemplate) -> PostToolTemplate:
+        POST_TOOL_TEMPLATES[name] = fn
+        return fn
+    return decorator
+
+
+@post_tool_template("create_task")
+def _created_task(result: Dict[str, Any]) -> Optional[str]:
+    content = (result.get("task") or {}).get("content")
+    if result.get("status") != "success" or not content:
+        return None
+    return f"Done, I've added {content}."
+
+
+@post_tool_template("update_task")
+def _updated_task(result: Dict[str, Any]) -> Optional[str]:
+    task = result.get("task") or {}
+    if result.get("status") != "success" or not task.get("content"):
+        return None
+    if task.get("is_completed"):
+        return f"Nice, I've marked {task['content']} as done."
+    return f"Okay, I've updated {task['content']}."
+
+
+@post_tool_template("save_info_for_future")
+def _saved_info(result: Dict[str, Any]) -> Optional[str]:
+    return "Got it, I'll remember that." if result.get("success") else None
+
+
+@post_tool_template("schedule_recurring_task")
+def _scheduled(result: Dict[str, Any]) -> Optional[str]:
+    return result.get("message") if result.get("status") == "success" else None
+
+
+def _step_results(messages: List[Any]) -> List[ToolMessage]:
+    """ToolMessages answering the last AIMessage's tool calls."""
+    results = []
+    for message in reversed(messages):
+        if not isinstance(message, ToolMessage):
+            break
+        results.append(message)
+    return results
+
+
+def _result_data(message: ToolMessage) -> Optional[Dict[str, Any]]:
+    try:
+        data = json.loads(message.content)
+    except (TypeError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _failed(message: ToolMessage) -> bool:
+    data = _result_data(message) or {}
+    return (getattr(message, "status", None) == "error" or data.get("status") == "error"
+            or data.get("success") is False)
+
+
+def _template_reply(messages: List[Any]) -> Optional[str]:
+    results = _step_results(messages)
+    if len(results) != 1 or results[0].name not in POST_TOOL_TEMPLATES:
+        return None
+    data = _result_data(results[0])
+    return POST_TOOL_TEMPLATES[results[0].name](data) if data is not None else None
+
+
+def _final_step(text: str, messages: List[Any], llm_calls: int) -> bool:
+    """
+    Whether the tool results just returned are likely all the turn needs, so
+    the next call only verbalizes them: the first tool round, nothing failed,
+    and no lookup that may be followed by a write the turn asks for.
+    """
+    results = _step_results(messages)
+    if llm_calls > 1 or not results or any(_failed(m) for m in results):
+        return False
+    return not (_WRITE_INTENT.search(text) and any(m.name in LOOKUP_TOOLS for m in results))
+
+
+def _tier(name: str) -> str:
+    # misconfigured routes fall back to the default model
+    return name if name in TIERS or name == "template" else "default"
+
+
+def route(transcript: str, messages: List[Any], llm_calls: int, tools_selected: Optional[frozenset]) -> Route:
+    """
+    Pick how this call_model iteration is answered.
+
+    After a tool returned, a single-intent turn whose tool results look final
+    only needs them verbalized: a template for simple write confirmations,
+    else JARVIS_MODEL_ROUTE_POST_TOOL. Turns that look like planning, or that
+    keep looping through tools, escalate to JARVIS_MODEL_ROUTE_PLANNING;
+    greetings and thanks go to JARVIS_MODEL_ROUTE_SMALLTALK. Everything else,
+    including confirmations and turns no tool group matched (all tools
+    bound), gets the default model.
+    """
+    if not settings.JARVIS_MODEL_CASCADE_ENABLED:
+        return Route("default", "cascade_off")
+
+    text = (transcript or "").lower()
+    multi_step = bool(_PLANNING.search(text) or _MULTI_INTENT.search(text))
+
+    if llm_calls > settings.JARVIS_MODEL_ESCALATE_AFTER_CALLS:
+        return Route(_tier(settings.JARVIS_MODEL_ROUTE_PLANNING), "many_steps")
+
+    if messages and isinstance(messages[-1], ToolMessage):
+        # the model may still have to call the next tool
+        if multi_step or not _final_step(text, messages, llm_calls):
+            return Route("default", "post_tool_continue")
+        if settings.JARVIS_POST_TOOL_TEMPLATES and _template_reply(messages):
+            return Route("template", "post_tool_template")
+        return Route(_tier(settings.JARVIS_MODEL_ROUTE_POST_TOOL), "post_tool")
+
+    if multi_step or len(text.split()) >= settings.JARVIS_MODEL_STRONG_MIN_WORDS:
+        return Route(_tier(settings.JARVIS_MODEL_ROUTE_PLANNING), "planning")
+    if _SMALLTALK.fullmatch(" ".join(_NORMALIZE.sub(" ", text.replace("jarvis", " ")).split())):
+        return Route(_tier(settings.JARVIS_MODEL_ROUTE_SMALLTALK), "smalltalk")
+    if tools_selected is None:
+        return Route("default", "unmatched")
+    return Route("default", "default")
+
+
+def template_message(messages: List[Any]) -> Optional[AIMessage]:
+    text = _template_reply(messages)
+    return AIMessage(content=text) if text else None
+
+
+def model_name(tier: str) -> str:
+    return {
+        "light": settings.JARVIS_MODEL_LIGHT,
+        "strong": settings.JARVIS_MODEL_STRONG,
+    }.get(tier, settings.JARVIS_MODEL_DEFAULT)
+
+
+def record(decision: Route) -> None:
+    metrics.incr(f"model_route_{decision.tier}")
+    metrics.incr(f"model_route_reason_{decision.reason}")
+
+
+def stats() -> dict:
+    counters = metrics.snapshot()["counters"]
+    routed = {tier: counters.get(f"model_route_{tier}", 0) for tier in TIERS + ("template",)}
+    return {
+        "enabled": settings.JARVIS_MODEL_CASCADE_ENABLED,
+        "models": {tier: model_name(tier) for tier in TIERS},
+        "routed": routed,
+        "reasons": {k[len("model_route_reason_"):]: v for k, v in counters.items()
+                    if k.startswith("model_route_reason_")},
+    }
@@ -6,6 +6,8 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse, JSONResponse
 from dotenv import load_dotenv
 from app.agent.websocket_handler import websocket_endpoint, get_active_sessions
+from app.core.session_registry import get_registry
+from app.agent import metrics, fast_path, tool_cache, speculation, tracing, model_routing
 
 
 load_dotenv()
@@ -29,7 +31,14 @@ async def health_check():
     return {
         "status": "healthy",
         "message": "Jarvis Task Manager is running",
-        "sessions": get_active_sessions()
+        "sessions": get_active_sessions(),
+        "metrics": metrics.snapshot(),
+        "fast_path": fast_path.stats(),
+        "tool_cache": tool_cache.stats(),
+        "speculation": speculation.stats(),
+        "session_registry": get_registry().stats(),
+        "tracing": tracing.stats(),
+        "model_routing": model_routing.stats()
     }
 
 
@@ -39,6 +48,12 @@ async def get_sessions():
     return get_active_sessions()
 
 
+@agentRouter.get("/traces")
+async def get_traces(limit: int = 20):
+    """Most recent turn traces (newest first) from the in-memory ring."""
+    return tracing.recent_traces(limit)
+
+
 @agentRouter.websocket("/ws")
 async def wsp(websocket: WebSocket):
     await websocket_endpoint(websocket=websocket)
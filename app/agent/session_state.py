@@ -0,0 +1,110 @@
+import sys
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import BaseMessage
+
+from app.config import settings
+from app.agent import metrics
+from app.agent.conversation_memory import schedule_summary
+
+# Live objects owned elsewhere (sockets, tasks, threads); not part of a session's data footprint
+LIVE_KEYS = frozenset({
+    "websocket", "loop", "turns", "audio_egress", "vad", "captions", "speculator",
+    "user_context_task", "summary_task",
+})
+# Only the conversation gives way when a session is over its byte budget (its
+# old turns go to the rolling summary). Reports are the only copy of what
+# get_email_report reads, so they are never trimmed.
+MESSAGE_OVERHEAD_BYTES = 400
+
+
+def estimate_bytes(value: Any, depth: int = 0) -> int:
+    """Rough deep size of session data (sys.getsizeof of the value and what it holds)."""
+    if isinstance(value, BaseMessage):
+        size = MESSAGE_OVERHEAD_BYTES + estimate_bytes(value.content, depth + 1)
+        for call in getattr(value, "tool_calls", None) or []:
+            size += estimate_bytes(call.get("args"), depth + 1)
+        return size
+    size = sys.getsizeof(value)
+    if depth > 6:
+        return size
+    if isinstance(value, dict):
+        size += sum(estimate_bytes(k, depth + 1) + estimate_bytes(v, depth + 1) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset, deque)):
+        size += sum(estimate_bytes(v, depth + 1) for v in value)
+    elif hasattr(type(value), "__slots__"):
+        size += sum(estimate_bytes(getattr(value, s, None), depth + 1) for s in type(value).__slots__)
+    return size
+
+
+def account(session: Dict[str, Any]) -> Dict[str, Any]:
+    """Per-field and total data bytes of a session (live objects excluded)."""
+    fields = {k: estimate_bytes(v) for k, v in list(session.items()) if k not in LIVE_KEYS}
+    total = sum(fields.values())
+    session["state_bytes"] = total
+    return {
+        "bytes": total,
+        "budget": settings.JARVIS_SESSION_MAX_BYTES,
+        "fields": {k: v for k, v in sorted(fields.items(), key=lambda kv: -kv[1])[:6]},
+        "idle_s": round(time.monotonic() - session.get("last_active", time.monotonic()), 1),
+        "hibernated": bool(session.get("hibernated")),
+    }
+
+
+def _trim_oldest_turn(session: Dict[str, Any]) -> bool:
+    items = session.get("conversation")
+    if not items:
+        return False
+    # oldest turn goes to the rolling summary rather than being lost
+    cut = next((i for i, m in enumerate(items[1:], 1) if m.type == "human"), len(items))
+    schedule_summary(session, items[:cut])
+    session["conversation"] = items[cut:]
+    return True
+
+
+def enforce_budget(session: Dict[str, Any]) -> int:
+    """Trim the session's data until it fits JARVIS_SESSION_MAX_BYTES; returns the resulting size."""
+    budget = settings.JARVIS_SESSION_MAX_BYTES
+    size = account(session)["bytes"]
+    while size > budget and _trim_oldest_turn(session):
+        metrics.incr("session_state_trims")
+        size = account(session)["bytes"]
+    if size > budget:
+        metrics.incr("session_state_over_budget")
+    return size
+
+
+def touch(session: Dict[str, Any]) -> None:
+    session["last_active"] = time.monotonic()
+    session["hibernated"] = False
+
+
+def hibernate(session: Dict[str, Any]) -> None:
+    """
+    Shed what an idle session can rebuild: the conversation moves to the
+    summary and the cached user context is reloaded on the next turn. The
+    connection stays open so scheduled triggers still reach the user.
+    """
+    conversation = session.get("conversation") or []
+    if conversation:
+        schedule_summary(session, conversation)
+    session["conversation"] = []
+    session.pop("user_context", None)
+    session["user_context_stale"] = True
+    session["hibernated"] = True
+    metrics.incr("sessions_hibernated")
+
+
+def idle_sessions(session_memory: Dict[str, Dict[str, Any]], now: Optional[float] = None) -> List[str]:
+    """Sessions with no turn for JARVIS_SESSION_IDLE_SECONDS that are not hibernated yet."""
+    now = now if now is not None else time.monotonic()
+    idle = []
+    for session_id, session in list(session_memory.items()):
+        turns = session.get("turns")
+        if session.get("hibernated") or (turns is not None and turns.busy):
+            continue
+        if now - session.get("last_active", now) > settings.JARVIS_SESSION_IDLE_SECONDS:
+            idle.append(session_id)
+    return idle
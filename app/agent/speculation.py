@@ -0,0 +1,229 @@
+import asyncio
+import json
+import re
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.agent import metrics
+
+_PUNCT = re.compile(r"[^a-z0-9' ]+")
+
+
+class SpeculationAborted(Exception):
+    """A speculative run reached a tool with side effects before it was committed."""
+
+
+def normalize(text: str) -> str:
+    # finals are formatted ("What time is it?"), partials are not
+    return " ".join(_PUNCT.sub(" ", (text or "").lower()).split())
+
+
+class ShadowSocket:
+    """
+    Stands in for the websocket during a speculative run: sends are buffered
+    until go_live() replays them (minus interim fillers) and switches to
+    passing them straight through.
+    """
+
+    def __init__(self, websocket):
+        self._websocket = websocket
+        self._buffer: List[str] = []
+        self._live = False
+
+    @property
+    def client_state(self):
+        return self._websocket.client_state
+
+    async def send_text(self, text: str) -> None:
+        if self._live:
+            await self._websocket.send_text(text)
+        else:
+            self._buffer.append(text)
+
+    async def go_live(self) -> None:
+        while self._buffer:
+            text = self._buffer.pop(0)
+            # the answer is (partly) ready already, "let me check" would only delay it
+            if json.loads(text).get("type") == "interim":
+                continue
+            await self._websocket.send_text(text)
+        self._live = True
+
+
+class Speculation:
+    def __init__(self, text: str):
+        self.text = text
+        self.key = normalize(text)
+        self.started_at = time.perf_counter()
+        self.finished_at: Optional[float] = None
+        self.committed = False
+        self.aborted_by: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+        self.socket: Optional[ShadowSocket] = None
+        self.session: Optional[Dict[str, Any]] = None
+
+    def check_tool(self, name: str, read_only: frozenset) -> None:
+        """Called before every tool call of the run; side effects wait for the final."""
+        if not self.committed and name not in read_only:
+            self.aborted_by = name
+            raise SpeculationAborted(name)
+
+    def cancel(self) -> None:
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+
+
+# Speculation the current task belongs to (inherited by the graph's node tasks)
+_current_speculation: ContextVar[Optional[Speculation]] = ContextVar(
+    "jarvis_current_speculation", default=None)
+
+
+def current_speculation() -> Optional[Speculation]:
+    return _current_speculation.get()
+
+
+class Speculator:
+    """
+    Per-session speculative execution on stable ASR partials.
+
+    When the partial transcript has not changed for `stable_ms` and is at
+    least `min_chars` long, `run_turn(socket, session_memory, text)` is started
+    in a shadow task against a ShadowSocket and a shallow copy of the session
+    (marked "speculative", so the turn's result is stashed rather than saved).
+    On the final, claim() hands back the speculation if the final says the
+    same thing; anything else is cancelled.
+    """
+
+    def __init__(self, websocket, session_id: str, session_memory: Dict[str, Dict[str, Any]],
+                 run_turn: Callable[..., Awaitable[None]], can_start: Callable[[], bool],
+                 stable_ms: int = 300, min_chars: int = 12):
+        self._websocket = websocket
+        self._session_id = session_id
+        self._session_memory = session_memory
+        self._run_turn = run_turn
+        self._can_start = can_start
+        self.stable_s = stable_ms / 1000
+        self.min_chars = min_chars
+
+        self._last_partial = ""
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._active: Optional[Speculation] = None
+
+    def on_partial(self, text: str) -> None:
+        key = normalize(text)
+        if key == self._last_partial:
+            return
+        self._last_partial = key
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        # the user kept talking: the running speculation answers the wrong question
+        if self._active is not None and self._active.key != key:
+            self._discard("speculation_stale")
+        if len(key) >= self.min_chars:
+            self._timer = asyncio.get_running_loop().call_later(self.stable_s, self._start, text)
+
+    def _start(self, text: str) -> None:
+        self._timer = None
+        if self._active is not None or not self._can_start():
+            return
+        session = self._session_memory.get(self._session_id)
+        if session is None:
+            return
+
+        spec = Speculation(text)
+        spec.socket = ShadowSocket(self._websocket)
+        spec.session = {
+            **session,
+            "conversation": list(session.get("conversation", [])),
+            "speculative": True,
+        }
+        shadow_memory = {self._session_id: spec.session}
+
+        async def shadow():
+            _current_speculation.set(spec)
+            try:
+                await self._run_turn(spec.socket, shadow_memory, text)
+            finally:
+                spec.finished_at = time.perf_counter()
+
+        spec.task = asyncio.create_task(shadow())
+        self._active = spec
+        metrics.incr("speculation_started")
+
+    def _discard(self, reason: str) -> None:
+        spec, self._active = self._active, None
+        if spec is not None:
+            spec.cancel()
+            metrics.incr(reason)
+
+    def claim(self, final_text: str) -> Optional[Speculation]:
+        """Take the speculation matching the final transcript; cancel everything else."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._last_partial = ""
+        spec = self._active
+        if spec is None:
+            return None
+        if spec.key != normalize(final_text) or spec.aborted_by:
+            self._discard("speculation_aborted" if spec.aborted_by else "speculation_misses")
+            return None
+        self._active = None
+        return spec
+
+    async def commit(self, spec: Speculation, store_turn: Callable[[Dict[str, Any], List[Any], List[Any]], None]) -> bool:
+        """
+        Deliver a claimed speculation as the real turn. Returns False when it
+        cannot be used (it hit a write tool or failed); the caller then runs
+        the turn normally.
+        """
+        if spec.task.done() and spec.session.get("speculative_result") is None:
+            # failed before the final arrived; nothing of it has reached the client
+            metrics.incr("speculation_aborted")
+            return False
+        spec.committed = True
+        claimed_at = time.perf_counter()
+        try:
+            await spec.socket.go_live()
+            await spec.task
+        except asyncio.CancelledError:
+            # barge-in on the committed turn
+            spec.cancel()
+            raise
+        except Exception as e:
+            print(f"Speculative run failed: {e}")
+
+        result = spec.session.get("speculative_result")
+        if spec.aborted_by or result is None:
+            metrics.incr("speculation_aborted")
+            return False
+
+        session = self._session_memory.get(self._session_id)
+        if session is not None:
+            store_turn(session, *result)
+        metrics.incr("speculation_hits")
+        # work already done when the final arrived
+        done_at = min(spec.finished_at or claimed_at, claimed_at)
+        metrics.observe("speculation_saved_ms", (done_at - spec.started_at) * 1000)
+        return True
+
+    def close(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        self._discard("speculation_misses")
+
+
+def stats() -> dict:
+    counters = metrics.snapshot()["counters"]
+    started = counters.get("speculation_started", 0)
+    hits = counters.get("speculation_hits", 0)
+    return {
+        "started": started,
+        "hits": hits,
+        "misses": counters.get("speculation_misses", 0),
+        "stale": counters.get("speculation_stale", 0),
+        "aborted": counters.get("speculation_aborted", 0),
+        "hit_rate": round(hits / started, 3) if started else 0.0,
+    }
@@ -0,0 +1,174 @@
+import asyncio
+import functools
+import json
+import re
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Dict, Optional
+
+from app.config import settings
+from app.agent import metrics
+
+KEY_PREFIX = "jarvis:tool-cache:"
+
+
+class MemoryCacheBackend:
+    """Per-process LRU with per-entry expiry."""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def size(self) -> Optional[int]:
+        return len(self._entries)
+
+    async def close(self) -> None:
+        self._entries.clear()
+
+
+class RedisCacheBackend:
+    """Shared across workers; values are stored as JSON with a Redis TTL."""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis_asyncio
+        self._redis = redis_asyncio.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+
+    async def get(self, key: str) -> Optional[Any]:
+        try:
+            raw = await self._redis.get(key)
+        except Exception as e:
+            # a cache outage must never fail the tool call
+            print(f"Tool cache get failed: {e}")
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        try:
+            await self._redis.set(key, json.dumps(value, default=str), ex=max(1, int(ttl)))
+        except Exception as e:
+            print(f"Tool cache set failed: {e}")
+
+    def size(self) -> Optional[int]:
+        return None
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+_backend = None
+_inflight: Dict[str, asyncio.Task] = {}
+_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"hits": 0, "misses": 0})
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        if settings.JARVIS_TOOL_CACHE_REDIS_URL:
+            _backend = RedisCacheBackend(settings.JARVIS_TOOL_CACHE_REDIS_URL)
+        else:
+            _backend = MemoryCacheBackend(settings.JARVIS_TOOL_CACHE_MAX_ENTRIES)
+    return _backend
+
+
+async def close_tool_cache() -> None:
+    global _backend
+    if _backend is not None:
+        await _backend.close()
+        _backend = None
+
+
+def normalize_query(text: str) -> str:
+    """Lowercase, collapse whitespace and drop surrounding punctuation."""
+    return re.sub(r"\s+", " ", (text or "").lower()).strip(" ?!.,;:'\"")
+
+
+def _cacheable(result: Any) -> bool:
+    return isinstance(result, dict) and result.get("status") != "error" and "error" not in result
+
+
+async def _call_and_store(fn, kwargs: Dict[str, Any], backend, cache_key: str, ttl: float) -> Any:
+    result = await fn(**kwargs)
+    if _cacheable(result):
+        await backend.set(cache_key, result, ttl)
+    return result
+
+
+def _call_done(cache_key: str, task: asyncio.Task) -> None:
+    if _inflight.get(cache_key) is task:
+        del _inflight[cache_key]
+    if not task.cancelled():
+        # mark retrieved so a failure nobody waited for is not logged
+        task.exception()
+
+
+def cached_tool(name: str, ttl: float, key: Optional[Callable[..., Any]] = None):
+    """
+    Cache an idempotent async tool function; put it under @tool.
+
+    `key` maps the call's keyword arguments to a canonical, JSON-serializable
+    key (defaults to the arguments themselves). Only successful results are
+    stored. Concurrent misses for the same key share one call, which runs in
+    its own task so no single caller's cancellation reaches the others.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(**kwargs):
+            if not settings.JARVIS_TOOL_CACHE_ENABLED:
+                return await fn(**kwargs)
+
+            canonical = key(**kwargs) if key else kwargs
+            cache_key = f"{KEY_PREFIX}{name}:{json.dumps(canonical, sort_keys=True, default=str)}"
+            backend = get_backend()
+
+            cached = await backend.get(cache_key)
+            if cached is not None:
+                _stats[name]["hits"] += 1
+                metrics.incr("tool_cache_hits")
+                return cached
+
+            pending = _inflight.get(cache_key)
+            if pending is not None:
+                _stats[name]["hits"] += 1
+                metrics.incr("tool_cache_hits")
+            else:
+                _stats[name]["misses"] += 1
+                metrics.incr("tool_cache_misses")
+                pending = asyncio.create_task(_call_and_store(fn, kwargs, backend, cache_key, ttl))
+                _inflight[cache_key] = pending
+                pending.add_done_callback(functools.partial(_call_done, cache_key))
+            # a caller that is cancelled (tool timeout, barge-in) only stops waiting;
+            # the shared call keeps running for everyone else on the key
+            return await asyncio.shield(pending)
+
+        return wrapper
+    return decorator
+
+
+def stats() -> dict:
+    backend = get_backend()
+    per_tool = {}
+    for name, counts in _stats.items():
+        total = counts["hits"] + counts["misses"]
+        per_tool[name] = {**counts, "hit_rate": round(counts["hits"] / total, 3) if total else 0.0}
+    return {
+        "backend": type(backend).__name__,
+        "entries": backend.size(),
+        "tools": per_tool,
+    }
@@ -0,0 +1,99 @@
+import re
+from collections import deque
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from langchain_core.messages import ToolMessage
+
+from app.agent import metrics
+
+# Tools used in this many previous turns stay bound (follow-ups like "move it to friday")
+STICKY_TURNS = 2
+
+_groups: List[Tuple[str, "re.Pattern", Tuple[str, ...]]] = []
+
+
+def register_tool_group(name: str, tool_names: Iterable[str], *patterns: str) -> None:
+    """Bind `tool_names` on turns whose transcript matches any of the patterns (searched)."""
+    _groups.append((name, re.compile("|".join(f"(?:{p})" for p in patterns)), tuple(tool_names)))
+
+
+register_tool_group(
+    "tasks",
+    ("create_task", "update_task", "get_tasks_of_the_user", "get_current_user_projects", "create_project"),
+    r"\b(tasks?|to ?dos?|remind(er|ers)?|projects?|due|deadline|overdue|priority|agenda|plans?)\b",
+    r"\b(add|put|create|complete|finish(ed)?|mark|move|postpone|reschedule|cancel|delete)\b",
+    r"\b(done with|my (day|week|list)|what('s| is) (left|pending|next))\b",
+)
+register_tool_group(
+    "recurring",
+    ("schedule_recurring_task",),
+    r"\b(every ?(day|morning|evening|night|week|monday|tuesday|wednesday|thursday|friday|saturday|sunday)|daily|recurring|each (day|morning))\b",
+)
+register_tool_group(
+    "memory",
+    ("save_info_for_future", "get_stored_information"),
+    r"\b(remember|forget|note that|keep in mind|my name|i live|i work|i like|i love|i hate|i prefer|my (wife|husband|son|daughter|kid|mom|dad|birthday|favorite))\b",
+    r"\b(what do you know about me|who am i)\b",
+)
+register_tool_group(
+    "weather",
+    ("get_weather", "search_google"),
+    r"\b(weather|temperature|forecast|rain(ing|y)?|snow(ing)?|sunny|umbrella|hot|cold)\b",
+)
+register_tool_group(
+    "email",
+    ("get_email_report",),
+    r"\b(e-?mails?|mails?|inbox|reports?)\b",
+)
+register_tool_group(
+    "summary",
+    ("summarize_session_history",),
+    r"\b(summar(y|ise|ize)|recap|what did we (talk|discuss)|so far)\b",
+)
+register_tool_group(
+    "standby",
+    ("send_to_standby",),
+    r"\b(standby|stand by|sleep|stop listening|go quiet|be quiet|shut up|goodbye|bye)\b",
+)
+register_tool_group(
+    "time",
+    ("get_current_time",),
+    r"\b(time|clock|date|today|tomorrow|tonight|o'?clock)\b",
+)
+register_tool_group(
+    "search",
+    ("search_google",),
+    r"\b(who|what|when|where|why|how|which|news|latest|price|score|search|look up|google|tell me about)\b",
+)
+
+
+def remember_tools(session: Dict[str, Any], messages: List[Any]) -> None:
+    """Record the tools a finished turn used, for stickiness on the next turns."""
+    used = frozenset(m.name for m in messages if isinstance(m, ToolMessage) and m.name)
+    session.setdefault("recent_tools", deque(maxlen=STICKY_TURNS)).append(used)
+
+
+def select_tools(transcript: str, session: Optional[Dict[str, Any]] = None) -> Optional[FrozenSet[str]]:
+    """
+    Tool names to bind for this turn, or None to bind everything.
+
+    Keyword groups pick the likely tools; tools used in the last few turns
+    are kept. A turn that matches no group (e.g. "yes, do that") gets the
+    full set rather than risking a missing tool.
+    """
+    text = (transcript or "").lower()
+    selected = set()
+    matched = []
+    for name, pattern, tool_names in _groups:
+        if pattern.search(text):
+            matched.append(name)
+            selected.update(tool_names)
+
+    if not matched:
+        metrics.incr("tool_selection_full")
+        return None
+
+    for used in (session or {}).get("recent_tools", ()):
+        selected.update(used)
+    metrics.incr("tool_selection_subset")
+    return frozenset(selected)
@@ -0,0 +1,206 @@
+import asyncio
+import json
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+from app.config import settings
+from app.agent import metrics
+
+STAGE_PREFIX = "stage_"
+
+
+class Span:
+    __slots__ = ("name", "start_ms", "end_ms", "attrs")
+
+    def __init__(self, name: str, start_ms: float, end_ms: Optional[float] = None,
+                 attrs: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+        self.attrs = attrs or {}
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ms if self.end_ms is not None else self.start_ms) - self.start_ms
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, "start_ms": round(self.start_ms, 1),
+                "duration_ms": round(self.duration_ms, 1), **self.attrs}
+
+
+class TurnTrace:
+    """
+    Timeline of one turn. Times are ms since the ASR final when the turn came
+    from speech (else since the turn started); marks are zero-length spans.
+    """
+
+    def __init__(self, session_id: str, received_at: Optional[float] = None, **attrs: Any):
+        self.trace_id = uuid.uuid4().hex[:12]
+        self.session_id = session_id
+        self.t0 = received_at or time.perf_counter()
+        self.wall_start = time.time() - (time.perf_counter() - self.t0)
+        self.attrs = attrs
+        self.spans: List[Span] = []
+        self.status = "ok"
+        if received_at is not None:
+            self.spans.append(Span("asr_final", 0.0))
+        self.mark("turn_start")
+
+    def now_ms(self) -> float:
+        return (time.perf_counter() - self.t0) * 1000
+
+    def mark(self, name: str, **attrs: Any) -> None:
+        self.spans.append(Span(name, self.now_ms(), attrs=attrs))
+
+    def first(self, name: str) -> Optional[Span]:
+        return next((s for s in self.spans if s.name == name), None)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "session_id": self.session_id,
+            "started_at": round(self.wall_start, 3),
+            "status": self.status,
+            **self.attrs,
+            "spans": [s.as_dict() for s in self.spans],
+        }
+
+
+_current_trace: ContextVar[Optional[TurnTrace]] = ContextVar("jarvis_current_trace", default=None)
+_ring: deque = deque(maxlen=max(1, settings.JARVIS_TRACE_RING_SIZE))
+_exporters: List[Callable[[Dict[str, Any]], None]] = []
+
+
+def register_exporter(exporter: Callable[[Dict[str, Any]], None]) -> None:
+    """Called with every finished trace (as a dict), off the event loop."""
+    _exporters.append(exporter)
+
+
+def log_exporter(trace: Dict[str, Any]) -> None:
+    print(f"TRACE {json.dumps(trace, default=str)}")
+
+
+def jsonl_exporter(path: str) -> Callable[[Dict[str, Any]], None]:
+    def export(trace: Dict[str, Any]) -> None:
+        with open(path, "a") as f:
+            f.write(json.dumps(trace, default=str) + "\n")
+    return export
+
+
+def current_trace() -> Optional[TurnTrace]:
+    return _current_trace.get()
+
+
+def start_trace(session_id: str, received_at: Optional[float] = None, **attrs: Any) -> TurnTrace:
+    """Start tracing the current task's turn; node tasks created afterwards inherit it."""
+    trace = TurnTrace(session_id, received_at, **attrs)
+    _current_trace.set(trace)
+    return trace
+
+
+def mark(name: str, **attrs: Any) -> None:
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.mark(name, **attrs)
+
+
+def set_status(status: str) -> None:
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.status = status
+
+
+@contextmanager
+def span(name: str, **attrs: Any):
+    """Time a block of the current turn; yields the span (or None when not tracing) for attrs."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+    s = Span(name, trace.now_ms(), attrs=attrs)
+    trace.spans.append(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.attrs["error"] = type(e).__name__
+        raise
+    finally:
+        s.end_ms = trace.now_ms()
+
+
+def _observe_stages(trace: TurnTrace, end_ms: float) -> None:
+    asr = trace.first("asr_final")
+    turn_start = trace.first("turn_start")
+    if asr is not None:
+        metrics.observe(f"{STAGE_PREFIX}asr_to_turn_ms", turn_start.start_ms)
+    graph = trace.first("graph_start")
+    if graph is not None:
+        metrics.observe(f"{STAGE_PREFIX}turn_to_graph_ms", graph.start_ms - turn_start.start_ms)
+    for s in trace.spans:
+        if s.name == "llm" and s.end_ms is not None:
+            metrics.observe(f"{STAGE_PREFIX}llm_ms", s.duration_ms)
+        elif s.name == "tool" and s.end_ms is not None:
+            metrics.observe(f"{STAGE_PREFIX}tool_ms", s.duration_ms)
+    first_chunk = trace.first("first_chunk")
+    if first_chunk is not None:
+        metrics.observe(f"{STAGE_PREFIX}first_chunk_ms", first_chunk.start_ms)
+    metrics.observe(f"{STAGE_PREFIX}turn_ms", end_ms)
+
+
+def finish_trace(trace: TurnTrace) -> None:
+    """Close the turn: per-stage histograms, the in-memory ring and the exporters."""
+    end_ms = trace.now_ms()
+    trace.mark("turn_end")
+    if _current_trace.get() is trace:
+        _current_trace.set(None)
+    if trace.status == "ok":
+        _observe_stages(trace, end_ms)
+    metrics.incr(f"traces_{trace.status}")
+
+    data = trace.as_dict()
+    _ring.append(data)
+    if _exporters:
+        try:
+            asyncio.get_running_loop().run_in_executor(None, _export, data)
+        except RuntimeError:
+            _export(data)
+
+
+def _export(data: Dict[str, Any]) -> None:
+    for exporter in list(_exporters):
+        try:
+            exporter(data)
+        except Exception as e:
+            print(f"Trace exporter failed: {e}")
+
+
+def recent_traces(limit: int = 20) -> List[Dict[str, Any]]:
+    return list(_ring)[-limit:][::-1]
+
+
+def stats() -> dict:
+    """Rolling per-stage latency histograms (p50/p95/p99) for alerting."""
+    samples = metrics.snapshot()["samples"]
+    return {
+        "stages": {name[len(STAGE_PREFIX):]: summary for name, summary in samples.items()
+                   if name.startswith(STAGE_PREFIX)},
+        "traces_kept": len(_ring),
+        "exporters": len(_exporters),
+    }
+
+
+def configure_exporters() -> None:
+    """JARVIS_TRACE_EXPORT: "log" or "jsonl:<path>" (unset: ring only)."""
+    target = settings.JARVIS_TRACE_EXPORT
+    if not target:
+        return
+    if target == "log":
+        register_exporter(log_exporter)
+    elif target.startswith("jsonl:"):
+        register_exporter(jsonl_exporter(target[len("jsonl:"):]))
+    else:
+        print(f"Unknown JARVIS_TRACE_EXPORT {target!r}, traces stay in memory only")
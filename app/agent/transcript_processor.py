@@ -1,6 +1,10 @@
 import asyncio
 import json
-from typing import TypedDict, Dict, List, Any, Optional
+import random
+import re
+import time
+from contextvars import ContextVar
+from typing import TypedDict, Awaitable, Callable, Dict, FrozenSet, List, Any, Optional, Tuple
 from fastapi import WebSocket
 from fastapi.websockets import WebSocketState
 from langchain_core.tools import tool
@@ -8,23 +12,30 @@ from langchain_openai import ChatOpenAI
 from langchain_core.messages import AIMessage, ToolMessage, HumanMessage, SystemMessage
 from langgraph.graph import StateGraph, END
 from datetime import datetime, timezone
-import httpx
-from openai import AsyncOpenAI
 
 from app.config import settings
+from app.core.http_clients import http_client, openai_client
+from app.agent import metrics, fast_path, tracing, model_routing
+from app.agent.conversation_memory import compact_conversation, format_summary_block
+from app.agent.tool_selection import select_tools, remember_tools
+from app.agent.tool_cache import cached_tool, normalize_query
+from app.agent.speculation import current_speculation
+from app.agent.session_state import enforce_budget
+from app.agent.user_context import get_user_context, format_context_block, mark_stale
+from app.agent.user_memory import read_facts, save_fact, rank
 from app.agent.helper import get_timezone_from_ip
-from app.db.models.user_info import UserInfo
-from app.db.session import get_db, get_db_context
-from app.api.todo.task.services import get_completed_tasks, get_pending_tasks, get_tasks_by_user
-from app.api.todo.project.services import get_projects
-
-from app.api.todo.task.services import create_task as ts_create_task, update_task as ts_update_task
-from app.api.todo.project.services import create_project as ps_create_project
+from app.db.session import get_db, get_db_context, run_db
+from app.core.recurring_tasks import add_scheduled_task
+from app.api.todo.task.services import search_tasks_async, create_task_async, update_task_async
+from app.api.todo.project.services import search_projects_async, create_project_async
 from app.api.todo.task.schemas import TaskCreate, TaskUpdate
 from app.api.todo.project.schemas import ProjectCreate
-from tavily import TavilyClient
 
-openai_client = ChatOpenAI(api_key=settings.OPENAI_API_KEY)
+TAVILY_SEARCH_URL = "https://api.tavily.com/search"
+
+# Upper bounds on rows a single lookup tool returns to the model
+MAX_TOOL_TASKS = 100
+MAX_TOOL_PROJECTS = 100
 
 
 class AgentState(TypedDict):
@@ -48,14 +59,24 @@ async def send_to_standby() -> dict:
 
 
 @tool
+@cached_tool("search_google", ttl=900, key=lambda query: normalize_query(query))
 async def search_google(query: str) -> dict:
     """
     This tool will provide you the realtime data and information from the web. You just need to call this tool and pass the query parameter and then it will return a dict containing some information about the search.
     """
-    tavily_client = TavilyClient(api_key="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")
-    response = tavily_client.search(query=query)
-    
-    return response
+    if not settings.TAVILY_API_KEY:
+        return {"status": "error", "error": "Web search is not configured (TAVILY_API_KEY is not set)."}
+    # Tavily's REST endpoint on the shared keep-alive pool (the SDK opens a new connection per call)
+    try:
+        response = await http_client("tavily").post(
+            TAVILY_SEARCH_URL,
+            json={"query": query, "search_depth": "basic", "max_results": 5},
+            headers={"Authorization": f"Bearer {settings.TAVILY_API_KEY}"},
+        )
+        response.raise_for_status()
+        return response.json()
+    except Exception as e:
+        return {"status": "error", "error": f"Search failed: {str(e)}"}
 
 
 @tool
@@ -69,6 +90,9 @@ async def summarize_session_history() -> dict:
         "conversation", [])
 
     history_lines = []
+    earlier = state["session_memory"][state["session_id"]].get("conversation_summary")
+    if earlier:
+        history_lines.append(f"Earlier: {earlier}")
     for m in messages:
         if isinstance(m, HumanMessage):
             history_lines.append(f"Commander: {m.content}")
@@ -81,10 +105,8 @@ async def summarize_session_history() -> dict:
         return {"status": "success", "summary": "No prior conversation."}
 
     try:
-        client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
-
-        resp = await client.chat.completions.create(
-            model="-4o",  # or "-4o", "gpt-3.5-turbo", etc.
+        resp = await openai_client().chat.completions.create(
+            model=settings.JARVIS_SUMMARY_MODEL,
             messages=[
                 {"role": "system", "content": "You are a helpful assistant that summarizes conversations."},
                 {"role": "user", "content": f"Summarize the following chat history:\n\n{history_str} and make it as short as possible."}
@@ -101,7 +123,7 @@ async def summarize_session_history() -> dict:
 
 
 @tool
-def schedule_recurring_task(task_description: str, time: str, frequency: str = "daily") -> dict:
+async def schedule_recurring_task(task_description: str, time: str, frequency: str = "daily") -> dict:
     """
     Schedules a recurring task/reminder for the user.
     
@@ -114,7 +136,6 @@ def schedule_recurring_task(task_description: str, time: str, frequency: str = "
         Confirmation message.
     """
     try:
-        from app.db.models.scheduled_task import ScheduledTask
         state = AgentStateRegistry.get_current_state()
         user_id = state["session_memory"][state["session_id"]]["user_id"]
         
@@ -126,18 +147,9 @@ def schedule_recurring_task(task_description: str, time: str, frequency: str = "
         except:
              return {"status": "error", "message": "Invalid time format. Please use HH:MM (24-hour)."}
 
-        with get_db_context() as db:
-            new_task = ScheduledTask(
-                user_id=user_id,
-                task_description=task_description,
-                schedule_time=time,
-                frequency=frequency,
-                timezone=state["session_memory"][state["session_id"]].get("timezone", "UTC"),
-                is_active=True
-            )
-            db.add(new_task)
-            db.commit()
-            return {"status": "success", "message": f"I've scheduled '{task_description}' for {frequency} at {time}."}
+        await run_db(add_scheduled_task, user_id, task_description, time, frequency,
+                     state["session_memory"][state["session_id"]].get("timezone", "UTC"))
+        return {"status": "success", "message": f"I've scheduled '{task_description}' for {frequency} at {time}."}
     except Exception as e:
         return {"status": "error", "message": f"Failed to schedule task: {str(e)}"}
 
@@ -145,64 +157,61 @@ def schedule_recurring_task(task_description: str, time: str, frequency: str = "
 @tool
 async def save_info_for_future(info: str):
     """Takes onliner input information that you think can be used in the future and should be remembered
-      for example The name of the user is Ali."""
+      for example The name of the user is Ali. Save one fact per call."""
     state = AgentStateRegistry.get_current_state()
-    with get_db_context() as db:
-        user_id = state["session_memory"][state["session_id"]]["user_id"]
-
-        # Fetch current info
-        user_info = db.query(UserInfo).filter(UserInfo.user_id == user_id).first()
-
-        if user_info:
-            user_info.info = (user_info.info or "") + \
-                info  # Append to existing info
-        else:
-            user_info = UserInfo(user_id=user_id, info=info)
-        db.add(user_info)
-
-        db.commit()
-        db.refresh(user_info)
+    user_id = state["session_memory"][state["session_id"]]["user_id"]
+    saved = await run_db(save_fact, user_id, info)
+    mark_stale(state["session_memory"][state["session_id"]])
+    if saved["status"] == "updated":
+        return {"success": True, "message": f"Updated the stored fact to '{info}'."}
     return {"success": True, "message": f"The piece of information '{info}' has been stored in the database."}
 
 
 @tool
-async def get_stored_information():
-    """Use this tool to get the information about the user this tool will provide you the information of the user that was saved during the privious conversation if available."""
+async def get_stored_information(query: str = ""):
+    """Use this tool to get the information about the user that was saved during previous conversations.
+    Pass what you are looking for as query (e.g. "daughter's birthday"); only the most relevant facts are returned."""
     state = AgentStateRegistry.get_current_state()
-    with get_db_context() as db:
-        user_id = state["session_memory"][state["session_id"]]["user_id"]
+    user_id = state["session_memory"][state["session_id"]]["user_id"]
+    facts = await run_db(read_facts, user_id)
+    if not facts:
+        return {"success": True, "message": "No information stored."}
 
-        # Fetch current info
-        user_info = db.query(UserInfo).filter(UserInfo.user_id == user_id).first()
-        info = user_info.info if user_info else "No information stored."
-
-    return {"success": True, "message": f"Here is the information stored in previous sessions: {info}"}
+    query = query or state["transcript"]
+    found = [text for _, (_, text) in rank(facts, query)[:settings.JARVIS_MEMORY_TOOL_TOP_K]]
+    if found:
+        message = "Here is the relevant information stored in previous sessions: " + " ".join(found)
+    else:
+        recent = [text for _, text in facts[:settings.JARVIS_MEMORY_TOOL_TOP_K]]
+        message = f"Nothing stored matches '{query}'. Most recently stored: " + " ".join(recent)
+    return {"success": True, "message": message, "total_stored": len(facts)}
 
 
 @tool
+# 2 decimals of lat/lon is ~1 km: nearby requests share an entry
+@cached_tool("get_weather", ttl=600, key=lambda latitude, longitude: [round(latitude, 2), round(longitude, 2)])
 async def get_weather(latitude: float, longitude: float) -> dict:
     """
     Get the current weather using latitude and longitude.
     Returns temperature and a short, human-friendly condition description.
     """
     try:
-        async with httpx.AsyncClient() as client:
-            url = f"https://api.open-meteo.com/v1/forecast?latitude={latitude}&longitude={longitude}&current=temperature_2m,weathercode"
-            response = await client.get(url, timeout=10)
-            data = response.json()
-            temp = data['current']['temperature_2m']
-            code = data['current']['weathercode']
-            condition_map = {
-                0: "clear skies", 1: "mostly clear", 2: "partly cloudy",
-                3: "overcast", 45: "fog", 51: "light drizzle",
-                61: "rain", 71: "snow", 95: "thunderstorm",
-            }
-            condition = condition_map.get(code, "unknown conditions")
-            return {
-                "status": "success",
-                "weather": {"temperature": temp, "condition": condition},
-                "spoken_response": f"Hmm, it's about {temp}°C with {condition} right now."
-            }
+        url = f"https://api.open-meteo.com/v1/forecast?latitude={latitude}&longitude={longitude}&current=temperature_2m,weathercode"
+        response = await http_client("open-meteo").get(url)
+        data = response.json()
+        temp = data['current']['temperature_2m']
+        code = data['current']['weathercode']
+        condition_map = {
+            0: "clear skies", 1: "mostly clear", 2: "partly cloudy",
+            3: "overcast", 45: "fog", 51: "light drizzle",
+            61: "rain", 71: "snow", 95: "thunderstorm",
+        }
+        condition = condition_map.get(code, "unknown conditions")
+        return {
+            "status": "success",
+            "weather": {"temperature": temp, "condition": condition},
+            "spoken_response": f"Hmm, it's about {temp}°C with {condition} right now."
+        }
     except Exception as e:
         return {"status": "error", "error": f"Could not get weather: {str(e)}"}
 
@@ -212,42 +221,35 @@ async def create_task(content: str, description: str, priority: int, project_id:
                       due_date: Optional[str] = None, reminder_at: Optional[str] = None) -> dict:
     """
     Create a new task in the user's task list.
-    Always use get_current_time first to adjust due_date and reminder_at for user's location.
+    Always use the user's local time (from the User Context, or get_current_time) for due_date and reminder_at.
     Both due_date and reminder_at are optional and if not specified to include then you must not include them at all instead of setting them into None or anything else.
     """
     state = AgentStateRegistry.get_current_state()
     try:
-        with get_db_context() as db:
-            user_id = state["session_memory"][state["session_id"]]["user_id"]
-            task = ts_create_task(
-                task=TaskCreate(
-                    content=content,
-                    description=description,
-                    priority=priority,
-                    project_id=project_id,
-                    due_date=due_date,
-                    reminder_at=reminder_at
-                ),
-                user_id=user_id,
-                db=db
-            )
-            
-            task_data = {
-                "id": getattr(task, "id", None),
-                "content": getattr(task, "content", None),
-                "description": getattr(task, "description", None),
-                "priority": getattr(task, "priority", None),
-                "project_id": getattr(task, "project_id", None),
-                "due_date": str(getattr(task, "due_date", None)),
-                "reminder_at": str(getattr(task, "reminder_at", None))
-            }
+        user_id = state["session_memory"][state["session_id"]]["user_id"]
+        task = await create_task_async(
+            task=TaskCreate(
+                content=content,
+                description=description,
+                priority=priority,
+                project_id=project_id,
+                due_date=due_date,
+                reminder_at=reminder_at
+            ),
+            user_id=user_id
+        )
+
+        task_data = {
+            "id": task.get("id"),
+            "content": task.get("content"),
+            "description": task.get("description"),
+            "priority": task.get("priority"),
+            "project_id": task.get("project_id"),
+            "due_date": str(task.get("due_date")),
+            "reminder_at": str(task.get("reminder_at"))
+        }
 
-        # Store in session memory as dict, not ORM object to avoid detachment issues
-        # Actually ts_create_task returns ORM object which is then appended to tasks list in session memory.
-        # This list in session_memory persists across requests. If we store detached objects, it might be fine if we only read attributes.
-        # But if we try to refresh them later it will fail.
-        # The original code stored 'task' (ORM object).
-        state["session_memory"][state["session_id"]]["tasks"].append(task) 
+        mark_stale(state["session_memory"][state["session_id"]])
 
         return {
             "status": "success",
@@ -263,41 +265,36 @@ async def update_task(id: str, content: str, description: str, is_completed: boo
                       due_date: Optional[str] = None, reminder_at: Optional[str] = None) -> dict:
     """
     Update an existing task by ID.
-    Always consider local time when setting due_date and reminder_at (use get_current_time first) and remember that if it is not specified to include the reminder_at and due_date then you must not include them at all.
+    Always consider local time when setting due_date and reminder_at (from the User Context, or get_current_time) and remember that if it is not specified to include the reminder_at and due_date then you must not include them at all.
     """
     state = AgentStateRegistry.get_current_state()
     try:
-        with get_db_context() as db:
-            user_id = state["session_memory"][state["session_id"]]["user_id"]
-            update_data = TaskUpdate(
-                content=content,
-                description=description,
-                is_completed=is_completed,
-                priority=priority,
-                project_id=project_id,
-                due_date=due_date,
-                reminder_at=reminder_at
-            )
+        user_id = state["session_memory"][state["session_id"]]["user_id"]
+        update_data = TaskUpdate(
+            content=content,
+            description=description,
+            is_completed=is_completed,
+            priority=priority,
+            project_id=project_id,
+            due_date=due_date,
+            reminder_at=reminder_at
+        )
 
-            task = ts_update_task(db, id, update_data, user_id)
-            
-            # Serialize for return
-            task_data = {
-                "id": getattr(task, "id", None),
-                "content": getattr(task, "content", None),
-                "description": getattr(task, "description", None),
-                "priority": getattr(task, "priority", None),
-                "project_id": getattr(task, "project_id", None),
-                "due_date": str(getattr(task, "due_date", None)),
-                "reminder_at": str(getattr(task, "reminder_at", None)),
-                "is_completed": getattr(task, "is_completed", None)
-            }
+        task = await update_task_async(id, update_data, user_id) or {}
+
+        # Serialize for return
+        task_data = {
+            "id": task.get("id"),
+            "content": task.get("content"),
+            "description": task.get("description"),
+            "priority": task.get("priority"),
+            "project_id": task.get("project_id"),
+            "due_date": str(task.get("due_date")),
+            "reminder_at": str(task.get("reminder_at")),
+            "is_completed": task.get("is_completed")
+        }
 
-        tasks = state["session_memory"][state["session_id"]]["tasks"]
-        for i, t in enumerate(tasks):
-            if str(getattr(t, 'id', None)) == str(id): # Ensure ID comparison works (string vs int)
-                tasks[i] = task
-                break
+        mark_stale(state["session_memory"][state["session_id"]])
 
         return {
             "status": "success",
@@ -315,63 +312,64 @@ async def create_project(name: str, color: str, is_favorite: bool, view_style: s
     """
     state = AgentStateRegistry.get_current_state()
     try:
-        with get_db_context() as db:
-            user_id = state["session_memory"][state["session_id"]]["user_id"]
-            project = ps_create_project(
-                project=ProjectCreate(
-                    name=name, color=color, is_favorite=is_favorite, view_style=view_style),
-                user_id=user_id,
-                db=db
-            )
-            
-            project_data = {
-                "name": getattr(project, "name", name),
-                "id": getattr(project, "id", 0)
-            }
-            
-        state["session_memory"][state["session_id"]]["projects"].append(
-            project_data["name"])
+        user_id = state["session_memory"][state["session_id"]]["user_id"]
+        project = await create_project_async(
+            project=ProjectCreate(
+                name=name, color=color, is_favorite=is_favorite, view_style=view_style),
+            user_id=user_id
+        )
+
+        project_data = {
+            "name": project.get("name", name),
+            "id": project.get("id", 0)
+        }
+
+        mark_stale(state["session_memory"][state["session_id"]])
         return {"status": "success", "project_id": project_data["id"]}
     except Exception as e:
         return {"status": "error", "error": str(e)}
 
 
 @tool
-async def get_tasks_of_the_user(type: str = "all") -> dict:
+async def get_tasks_of_the_user(type: str = "all", project_id: Optional[int] = None,
+                                due_after: Optional[str] = None, due_before: Optional[str] = None,
+                                priority: Optional[int] = None, text: Optional[str] = None,
+                                limit: int = 20) -> dict:
     """
-    Get the pending tasks for the current user fromt the db.
-    The param type can be either pending, completed or all.
+    Look up the user's tasks in the db, soonest due first.
+    type: pending, completed or all. Optional filters: project_id, due_after / due_before
+    (YYYY-MM-DD or YYYY-MM-DDTHH:MM, local time), priority (1-4), text (matches the task
+    content or description) and limit (default 20, max 100).
+    Returns id, content, due_date, priority, project_id and is_completed per task, the total
+    number of matches and truncated=true when not all of them were returned; narrow the
+    filters instead of raising the limit.
     """
     state = AgentStateRegistry.get_current_state()
-    with get_db_context() as db:
-        user_id = state["session_memory"][state["session_id"]]["user_id"]
-
-        if type == "pending":
-            tasks = [i.to_dict()
-                     for i in get_pending_tasks(db=db, user_id=user_id)]
-        elif type == "completed":
-            tasks = [i.to_dict()
-                     for i in get_completed_tasks(db=db, user_id=user_id)]
-        else:
-            tasks = [i.to_dict()
-                     for i in get_tasks_by_user(db=db, user_id=user_id)]
+    user_id = state["session_memory"][state["session_id"]]["user_id"]
 
-    return {"status": "success", "tasks": tasks}
+    result = await search_tasks_async(
+        user_id=user_id,
+        status=type if type in ("pending", "completed") else "all",
+        project_id=project_id,
+        due_after=due_after,
+        due_before=due_before,
+        priority=priority,
+        text=text,
+        limit=max(1, min(limit, MAX_TOOL_TASKS)),
+    )
+    return {"status": "success", **result}
 
 
 @tool
-async def get_current_user_projects() -> dict:
+async def get_current_user_projects(name: Optional[str] = None, limit: int = 50) -> dict:
     """
-    Return all project names in the current session.
+    Return the user's projects (id, name, is_inbox_project, is_favorite), inbox first.
+    Pass name to match part of a project name.
     """
     state = AgentStateRegistry.get_current_state()
-    with get_db_context() as db:
-        user_id = state["session_memory"][state["session_id"]]["user_id"]
-        projects = [i.to_dict() for i in get_projects(db=db, user_id=user_id)]
-    return {
-        "status": "success",
-        "projects": projects
-    }
+    user_id = state["session_memory"][state["session_id"]]["user_id"]
+    result = await search_projects_async(user_id=user_id, name=name, limit=max(1, min(limit, MAX_TOOL_PROJECTS)))
+    return {"status": "success", **result}
 
 
 @tool
@@ -415,39 +413,34 @@ async def get_current_time() -> dict:
     }
 
 
-class AgentStateRegistry:
-    # Changed from single _state to a dictionary of states by session_id
-    _states: Dict[str, AgentState] = {}
-    _current_session_id: Optional[str] = None
+# State of the turn being processed. Each turn runs in its own asyncio task
+# (and LangGraph copies the context into node tasks), so concurrent turns on
+# one worker (other sessions, or a speculative shadow run of the same
+# session) never see each other's state.
+_current_state: ContextVar[Optional[AgentState]] = ContextVar(
+    "jarvis_current_state", default=None)
 
-    @classmethod
-    def set_state(cls, state: AgentState):
-        """Set state for a specific session"""
-        session_id = state["session_id"]
-        cls._states[session_id] = state
-        cls._current_session_id = session_id
 
+class AgentStateRegistry:
     @classmethod
-    def get_state(cls, session_id: str) -> AgentState:
-        """Get state for a specific session"""
-        if session_id not in cls._states:
-            raise ValueError(f"No state found for session {session_id}")
-        return cls._states[session_id]
+    def set_state(cls, state: AgentState):
+        """Make state current for this task (and the node tasks it spawns)"""
+        _current_state.set(state)
 
     @classmethod
     def get_current_state(cls) -> AgentState:
-        """Get the currently active state (for tools that don't have session context)"""
-        if cls._current_session_id is None:
+        """Get the state of the turn owning the current task (for tools)"""
+        state = _current_state.get()
+        if state is None:
             raise ValueError("No current session set")
-        return cls._states[cls._current_session_id]
+        return state
 
     @classmethod
     def cleanup_session(cls, session_id: str):
         """Clean up state when a session ends"""
-        if session_id in cls._states:
-            del cls._states[session_id]
-        if cls._current_session_id == session_id:
-            cls._current_session_id = None
+        state = _current_state.get()
+        if state is not None and state["session_id"] == session_id:
+            _current_state.set(None)
 
 
 tools = [
@@ -458,11 +451,43 @@ tools = [
     schedule_recurring_task
 ]
 
-model = ChatOpenAI(
-    model="gpt-4o-mini",
-    temperature=0.8,
-    openai_api_key=settings.OPENAI_API_KEY
-).bind_tools(tools)
+def _chat_model(name: str) -> ChatOpenAI:
+    return ChatOpenAI(
+        model=name,
+        temperature=settings.JARVIS_MODEL_TEMPERATURE,
+        openai_api_key=settings.OPENAI_API_KEY,
+        # token usage on streamed replies too (turn traces)
+        stream_usage=True
+    )
+
+
+base_model = _chat_model(settings.JARVIS_MODEL_DEFAULT)
+model = base_model.bind_tools(tools)
+
+# Light / strong models of the cascade (see model_routing), created on first use
+_tier_models: Dict[str, Any] = {}
+
+# Bound model per (tier, selected tool subset); schemas keep the order of `tools`
+_bound_models: Dict[Tuple[str, Optional[FrozenSet[str]]], Any] = {}
+
+
+def base_model_for(tier: str):
+    if tier == "default":
+        return base_model
+    if tier not in _tier_models:
+        _tier_models[tier] = _chat_model(model_routing.model_name(tier))
+    return _tier_models[tier]
+
+
+def model_for_tools(selected: Optional[FrozenSet[str]], tier: str = "default"):
+    if selected is None and tier == "default":
+        return model
+    bound = _bound_models.get((tier, selected))
+    if bound is None:
+        bound = base_model_for(tier).bind_tools(
+            [t for t in tools if selected is None or t.name in selected])
+        _bound_models[(tier, selected)] = bound
+    return bound
 
 
 def should_continue(state: AgentState) -> str:
@@ -473,8 +498,13 @@ def should_continue(state: AgentState) -> str:
 async def call_model(state: AgentState) -> AgentState:
     try:
         session = state["session_memory"][state["session_id"]]
-        tasks = session.get("tasks", [])
-        projects = session.get("projects", [])
+
+        messages = state["messages"]
+        context_block = ""
+        if not any(isinstance(m, SystemMessage) for m in messages):
+            # cached per session; only the time line is rebuilt every turn
+            context_block = format_context_block(session, await get_user_context(session), state["transcript"])
+            context_block += format_summary_block(session)
 
         system_prompt = SystemMessage(content=f"""
 
@@ -533,27 +563,28 @@ You are **Jarvis**, a text-to-speech assistant designed for natural, human-like
 ### Time Management (CRITICAL)
 **ALWAYS follow this sequence for ANY time-related task:**
 
-1. **MUST call `get_current_time` tool first** for any scheduling, reminders, or time calculations
-2. **Calculate local time manually** using the UTC time and timezone offset provided
-3. **Use the calculated local time** for all scheduling operations
+1. **Take the current local time from the User Context block** at the end of this prompt; only call `get_current_time` if it is missing
+2. **Use the local time and UTC offset shown there** for all scheduling operations
 
 Example process:
-- Tool returns: `"current_utc_time": "2024-01-15T10:30:00Z", "timezone": "Asia/Karachi"`
-- Calculate: Asia/Karachi is UTC+5, so local time = 15:30 (3:30 PM)
-- Use 15:30 for scheduling
+- Context shows: `Current local time: 2024-01-15 15:30 Asia/Karachi UTC+0500`
+- Use 15:30 (3:30 PM) local time for scheduling
 
 ### Task Management
-- **For adding/updating tasks:** MUST first call `get_current_user_projects` tool to get project IDs
+- **For adding/updating tasks:** Take project IDs from the User Context block; only call `get_current_user_projects` if the project is not listed there
+- **Pending tasks** are listed in the User Context block; only call `get_tasks_of_the_user` for completed tasks or when the list says more exist
 - **Default project:** Use "Inbox" project ID if no specific project mentioned
 - **Task retrieval:** Use `get_tasks_of_the_user` with parameters:
   - `type="completed"` for completed tasks
   - `type="pending"` for pending tasks  
   - `type="all"` for all tasks (default)
+  - Filter instead of fetching everything: `project_id`, `due_after`/`due_before` (e.g. today's date for "due today"), `priority`, `text`
+  - If the result says `truncated`, tell the user how many there are (`total`) and offer to narrow it down
 
 ### Information Storage
 - **Saving user info:** Use `save_info_for_future` for information that should be remembered
   - Format: `info: "The user lives in Toronto"`
-- **Retrieving user info:** Use `get_stored_information` to fetch previously saved user information
+- **Retrieving user info:** The most relevant stored facts are already in the User Context block; use `get_stored_information` with a `query` only if what you need is missing there
 
 ## Error Handling
 - **Never show raw error messages** to the user
@@ -565,8 +596,8 @@ Example process:
 Before responding, verify:
 - [ ] Did I use natural, conversational language?
 - [ ] Did I avoid unnecessary politeness or padding phrases?
-- [ ] For time-related tasks: Did I get current time and calculate local time?
-- [ ] For task operations: Did I get project IDs first?
+- [ ] For time-related tasks: Did I use the local time from the User Context?
+- [ ] For task operations: Did I use the right project ID?
 - [ ] Is my response concise and direct?
 - [ ] Are all technical details translated to human-readable format?
 - [ ] Did I avoid emojis and symbols?
@@ -575,9 +606,9 @@ Before responding, verify:
 1. **Acknowledge the request** (briefly)
 2. **Take action** using appropriate tools
 3. **Provide clear results** in natural language
-4. **Offer follow-up** if relevant (without asking generic "how can I help" questions)""")
+4. **Offer follow-up** if relevant (without asking generic "how can I help" questions)
 
-        messages = state["messages"]
+{context_block}""")
 
         if not any(isinstance(m, SystemMessage) for m in messages):
             messages.insert(0, system_prompt)
@@ -590,7 +621,28 @@ Before responding, verify:
 
         # Set the current session for tools to access
         AgentStateRegistry.set_state(state)
-        reply = await model.ainvoke(messages)
+        # only the tools this turn is likely to need are sent with the request
+        selected = select_tools(state["transcript"], session)
+        # cheap model / template for verbalizing, stronger model for planning
+        decision = model_routing.route(
+            state["transcript"], messages, session.get("turn_llm_calls", 0), selected)
+        model_routing.record(decision)
+
+        reply = model_routing.template_message(messages) if decision.tier == "template" else None
+        if reply is not None:
+            tracing.mark("template", reason=decision.reason)
+        else:
+            tier = decision.tier if decision.tier != "template" else "default"
+            session["turn_llm_calls"] = session.get("turn_llm_calls", 0) + 1
+            metrics.incr("llm_calls")
+            metrics.observe("tools_bound", len(selected) if selected is not None else len(tools))
+            with tracing.span("llm", call=session["turn_llm_calls"], tier=tier, reason=decision.reason,
+                              tools=len(selected) if selected is not None else len(tools)) as llm_span:
+                reply = await model_for_tools(selected, tier).ainvoke(messages)
+                usage = getattr(reply, "usage_metadata", None)
+                if llm_span is not None and usage:
+                    llm_span.attrs["tokens_in"] = usage.get("input_tokens")
+                    llm_span.attrs["tokens_out"] = usage.get("output_tokens")
         state["messages"].append(reply)
         state["response"] = reply.content or ""
 
@@ -606,6 +658,127 @@ Before responding, verify:
         return state
 
 
+TOOLS_BY_NAME = {t.name: t for t in tools}
+
+# Per-tool timeouts (seconds); anything not listed uses JARVIS_TOOL_TIMEOUT_SECONDS
+TOOL_TIMEOUTS: Dict[str, float] = {
+    "get_current_time": 2.0,
+    "send_to_standby": 2.0,
+    "get_weather": 10.0,
+    "search_google": 15.0,
+    "summarize_session_history": 30.0,
+}
+
+
+# Tools without side effects: the only ones a speculative run may call before it is committed
+READ_ONLY_TOOLS = frozenset({
+    "get_current_time", "get_tasks_of_the_user", "get_current_user_projects", "get_email_report",
+    "get_weather", "search_google", "get_stored_information", "summarize_session_history",
+})
+
+# Spoken while a slow tool call is still running (see _interim_after)
+INTERIM_PHRASES: Dict[str, List[str]] = {
+    "get_tasks_of_the_user": ["Let me check your tasks.", "Checking your list."],
+    "get_current_user_projects": ["Let me check your projects."],
+    "create_task": ["Adding that now.", "Putting that on your list."],
+    "update_task": ["Updating that for you.", "One sec, updating it."],
+    "create_project": ["Setting up that project."],
+    "search_google": ["Let me look that up.", "Give me a second to look that up."],
+    "get_weather": ["Checking the weather.", "Let me check the forecast."],
+    "summarize_session_history": ["Let me pull that together."],
+    "save_info_for_future": ["Noting that down."],
+    "get_stored_information": ["Let me check what I know."],
+    "schedule_recurring_task": ["Setting that up."],
+    "get_email_report": ["Checking your email report."],
+}
+DEFAULT_INTERIM_PHRASES = ["One moment.", "Just a sec."]
+
+# Callback that speaks an interim phrase for the turn being processed (set per turn,
+# inherited by the graph's node tasks like _current_state)
+# returns whether the phrase was sent
+_interim_sender: ContextVar[Optional[Callable[[str], Awaitable[bool]]]] = ContextVar(
+    "jarvis_interim_sender", default=None)
+
+
+def _interim_phrase(tool_calls: List[dict]) -> Optional[str]:
+    names = [c["name"] for c in tool_calls]
+    # near-instant tools never need an acknowledgement
+    if all(name in ("get_current_time", "send_to_standby") for name in names):
+        return None
+    for name in names:
+        if name in INTERIM_PHRASES:
+            return random.choice(INTERIM_PHRASES[name])
+    return random.choice(DEFAULT_INTERIM_PHRASES)
+
+
+async def _interim_after(delay: float, session: Dict[str, Any], tool_calls: List[dict]) -> None:
+    """Speak a short acknowledgement once the tool calls have taken longer than `delay`."""
+    await asyncio.sleep(delay)
+    sender = _interim_sender.get()
+    phrase = _interim_phrase(tool_calls)
+    if sender is None or phrase is None or session.get("turn_interim_sent"):
+        return
+    try:
+        if await sender(phrase):
+            session["turn_interim_sent"] = True
+            metrics.incr("interim_acks")
+    except Exception as e:
+        print(f"Error sending interim message: {e}")
+
+
+async def _run_tool_call(tool_call: dict, semaphore: asyncio.Semaphore):
+    """Run one tool call; returns (ToolMessage, result dict or None, error response text)."""
+    name = tool_call["name"]
+    args = tool_call["args"]
+    tool_call_id = tool_call["id"]
+
+    tool_fn = TOOLS_BY_NAME.get(name)
+    if not tool_fn:
+        return ToolMessage(
+            tool_call_id=tool_call_id,
+            content=json.dumps({"error": "tool not found"}),
+            name=name
+        ), None, f"No tool for {name}"
+
+    speculation = current_speculation()
+    if speculation is not None:
+        # raises SpeculationAborted for write tools; the final then runs the turn for real
+        speculation.check_tool(name, READ_ONLY_TOOLS)
+
+    timeout = TOOL_TIMEOUTS.get(name, settings.JARVIS_TOOL_TIMEOUT_SECONDS)
+    async with semaphore:
+        started = time.perf_counter()
+        with tracing.span("tool", tool=name) as tool_span:
+            try:
+                result = await asyncio.wait_for(tool_fn.ainvoke(args), timeout=timeout)
+            except asyncio.TimeoutError:
+                metrics.incr("tool_timeouts")
+                print(f"Tool {name} timed out after {timeout}s")
+                if tool_span is not None:
+                    tool_span.attrs["error"] = "timeout"
+                return ToolMessage(
+                    tool_call_id=tool_call_id,
+                    content=json.dumps({"error": f"{name} took too long to respond"}),
+                    name=name
+                ), None, f"Error using {name}"
+            except Exception as ex:
+                if tool_span is not None:
+                    tool_span.attrs["error"] = type(ex).__name__
+                return ToolMessage(
+                    tool_call_id=tool_call_id,
+                    content=json.dumps({"error": str(ex)}),
+                    name=name
+                ), None, f"Error using {name}"
+            finally:
+                metrics.observe(f"tool_ms.{name}", (time.perf_counter() - started) * 1000)
+
+    return ToolMessage(
+        tool_call_id=tool_call_id,
+        content=json.dumps(result),
+        name=name
+    ), result, None
+
+
 async def custom_tool_node(state: AgentState) -> AgentState:
     if not state["messages"]:
         return state
@@ -617,61 +790,48 @@ async def custom_tool_node(state: AgentState) -> AgentState:
     # Ensure the current session is set for tools
     AgentStateRegistry.set_state(state)
 
+    # Independent tool calls from one model turn run concurrently (bounded);
+    # gather keeps the original order and cancels the rest if the turn is cancelled.
+    semaphore = asyncio.Semaphore(max(1, settings.JARVIS_TOOL_CONCURRENCY))
+    session = state["session_memory"][state["session_id"]]
+    interim = asyncio.create_task(
+        _interim_after(settings.JARVIS_INTERIM_AFTER_SECONDS, session, last.tool_calls))
+    try:
+        outcomes = await asyncio.gather(
+            *(_run_tool_call(tool_call, semaphore) for tool_call in last.tool_calls)
+        )
+    finally:
+        interim.cancel()
+
     tool_messages: List[ToolMessage] = []
 
-    for tool_call in last.tool_calls:
+    for tool_call, (tool_message, result, error_response) in zip(last.tool_calls, outcomes):
         name = tool_call["name"]
-        args = tool_call["args"]
-        tool_call_id = tool_call["id"]
-
-        tool_fn = next((t for t in tools if t.name == name), None)
-
-        if tool_fn:
-            try:
-                result = await tool_fn.ainvoke(args)
-                tool_messages.append(
-                    ToolMessage(
-                        tool_call_id=tool_call_id,
-                        content=json.dumps(result),
-                        name=name
-                    )
-                )
-
-                # ✅ special handling for tasks
-                if name in ["create_task", "update_task"] and result.get("status") == "success":
-                    state["response"] = (
-                        "Task updated." if name == "update_task" else "Task created."
-                    )
-                    state["task"] = result.get("task")  # <-- store task
-                if name == "summarize_session_history" and result.get("status") == "success":
-                    state["response"] = result["summary"]
-                    # <-- store summary in state
-                    state["summary"] = result["summary"]
-
-                else:
-                    state["response"] = (
-                        result.get("spoken_response") or result.get(
-                            "status", "done")
-                    )
+        tool_messages.append(tool_message)
+
+        if error_response is not None:
+            state["response"] = error_response
+            continue
+        if not isinstance(result, dict):
+            state["response"] = "done"
+            continue
+
+        # ✅ special handling for tasks
+        if name in ["create_task", "update_task"] and result.get("status") == "success":
+            state["response"] = (
+                "Task updated." if name == "update_task" else "Task created."
+            )
+            state["task"] = result.get("task")  # <-- store task
+        if name == "summarize_session_history" and result.get("status") == "success":
+            state["response"] = result["summary"]
+            # <-- store summary in state
+            state["summary"] = result["summary"]
 
-            except Exception as ex:
-                tool_messages.append(
-                    ToolMessage(
-                        tool_call_id=tool_call_id,
-                        content=json.dumps({"error": str(ex)}),
-                        name=name
-                    )
-                )
-                state["response"] = f"Error using {name}"
         else:
-            tool_messages.append(
-                ToolMessage(
-                    tool_call_id=tool_call_id,
-                    content=json.dumps({"error": "tool not found"}),
-                    name=name
-                )
+            state["response"] = (
+                result.get("spoken_response") or result.get(
+                    "status", "done")
             )
-            state["response"] = f"No tool for {name}"
 
     state["messages"].extend(tool_messages)
 
@@ -696,11 +856,149 @@ def build_graph():
 app = build_graph()
 
 
+_SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*\s+|\n+")
+ERROR_PHRASES = ["oops, something broke", "connection error", "error:", "exception:"]
+FALLBACK_ERROR_TEXT = "Hmm, it looks like something went wrong connecting to the service. Let's try again in a moment, or you can ask me about something else."
+
+
+def smart_humanize(text, transcript=None, result_obj=None, pad_short=True):
+    """Advanced conversational guardrails applied to text before it is spoken."""
+    # Remove asterisks
+    text = text.replace("*", "")
+    # Remove unsupported symbols
+    text = re.sub(r"[^a-zA-Z0-9 .,?!'\"\n:-]", "", text)
+    # # Add varied sentence starters
+    # starters = ["Alright,", "Okay,", "Well,", "Here's what I found:", "Let's see:", "Just a moment:", "Hmm,"]
+    # if text and not text.lower().startswith(tuple(s.lower() for s in starters)):
+    #     text = text[0].lower() + text[1:]
+    # Add context-aware follow-up
+    if transcript:
+        if "time" in transcript.lower() and result_obj and "local_time" in result_obj:
+            text += f" By the way, your local time is {result_obj['local_time']}."
+        # if "reminder" in transcript.lower():
+        #     text += " If you'd like to adjust the reminder, just let me know."
+        # if "task" in transcript.lower():
+        #     text += " You can always ask for your pending or completed tasks."
+    # Avoid robotic/short responses
+    if pad_short and len(text) < 15:
+        text += " If you need more details, just ask."
+    # Make sure it doesn't sound dumb
+    text = text.replace("sorry", "Let's see what we can do.")
+    return text.strip()
+
+
+def clean_spoken_text(text, transcript=None, result_obj=None, pad_short=True):
+    """smart_humanize plus the raw-error replacement; returns what is sent to TTS."""
+    cleaned = smart_humanize(text, transcript, result_obj, pad_short=pad_short)
+    # If the response contains a raw error, replace with a natural, helpful message
+    if any(e in cleaned.lower() for e in ERROR_PHRASES):
+        cleaned = FALLBACK_ERROR_TEXT
+    return cleaned.replace("*", "")
+
+
+class SentenceChunker:
+    """Accumulates streamed LLM tokens and cuts them at sentence boundaries."""
+
+    def __init__(self, min_chars: int = 12):
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        self._buffer += text
+        sentences = []
+        while True:
+            cut = None
+            for match in _SENTENCE_END.finditer(self._buffer):
+                # very short pieces ("Hmm." / "Dr.") are merged with the next one
+                if match.end() >= self.min_chars:
+                    cut = match.end()
+                    break
+            if cut is None:
+                return sentences
+            sentence = self._buffer[:cut].strip()
+            self._buffer = self._buffer[cut:]
+            if sentence:
+                sentences.append(sentence)
+
+    def flush(self) -> str:
+        rest, self._buffer = self._buffer.strip(), ""
+        return rest
+
+
+async def _answer_from_fast_path(websocket: WebSocket, session_id: str, transcript: str,
+                                 session_memory: Dict[str, Dict[str, Any]], reply: dict) -> None:
+    """Deliver a fast-path reply with the usual start/chunk/end framing."""
+    text = clean_spoken_text(reply["text"], pad_short=False)
+    standby = bool(reply.get("standby"))
+    if websocket.client_state == WebSocketState.CONNECTED:
+        await websocket.send_text(json.dumps({"type": "start", "text": ""}))
+        payload = {"type": "chunk", "text": text}
+        if standby:
+            payload["standby"] = True
+        await websocket.send_text(json.dumps(payload))
+        print(payload)
+        if not standby:
+            await asyncio.sleep(0.02)
+            await websocket.send_text(json.dumps({"type": "end", "text": ""}))
+
+    # keep the exchange in memory so follow-up turns have context
+    session = session_memory[session_id]
+    store_turn(session, session.get("conversation", []) + [HumanMessage(content=transcript), AIMessage(content=text)], [])
+
+
+def store_turn(session: Dict[str, Any], messages: List[Any], new_messages: List[Any]) -> None:
+    """Save a finished turn; a speculative run only stashes it until the final confirms it."""
+    if session.get("speculative"):
+        session["speculative_result"] = (messages, new_messages)
+        return
+    # token-budgeted window; older turns go to the rolling summary in the background
+    session["conversation"] = compact_conversation(session, messages)
+    remember_tools(session, new_messages)
+    enforce_budget(session)
+
+
+def _is_standby(messages: List[Any]) -> bool:
+    for msg in messages:
+        if isinstance(msg, ToolMessage):
+            try:
+                data = json.loads(msg.content)
+                if data.get("standby") is True:
+                    return True
+            except Exception:
+                continue
+    return False
+
+
 async def process_transcript_streaming(
     websocket: WebSocket,
     session_id: str,
     transcript: str,
     session_memory: Dict[str, Dict[str, Any]]
+) -> None:
+    session = session_memory[session_id]
+    # timed from the ASR final when the turn came from speech
+    trace = tracing.start_trace(
+        session_id,
+        received_at=session.pop("asr_final_at", None),
+        speculative=bool(session.get("speculative")),
+    )
+    try:
+        await _process_turn(websocket, session_id, transcript, session_memory)
+    except asyncio.CancelledError:
+        trace.status = "cancelled"
+        raise
+    except Exception:
+        trace.status = "error"
+        raise
+    finally:
+        tracing.finish_trace(trace)
+
+
+async def _process_turn(
+    websocket: WebSocket,
+    session_id: str,
+    transcript: str,
+    session_memory: Dict[str, Dict[str, Any]]
 ) -> None:
     # Stronger guard against tiny/accidental turns, but keep behavior
     if not transcript or len(transcript.strip()) < 4:
@@ -716,87 +1014,133 @@ async def process_transcript_streaming(
         "session_memory": session_memory
     }
 
+    # Bind this task to the session before the graph runs; node tasks inherit it
+    AgentStateRegistry.set_state(state)
+
+    # Trivial commands (time, standby, pending tasks) are answered without the LLM
+    if settings.JARVIS_FAST_PATH_ENABLED:
+        try:
+            reply = await fast_path.try_fast_path(transcript, TOOLS_BY_NAME)
+            if reply is not None:
+                tracing.mark("fast_path")
+                metrics.observe("llm_calls_per_turn", 0)
+                await _answer_from_fast_path(websocket, session_id, transcript, session_memory, reply)
+                return
+        except Exception as e:
+            print(f"Fast path error, using agent: {e}")
+
+    session_memory[session_id]["turn_llm_calls"] = 0
+    session_memory[session_id]["turn_interim_sent"] = False
+    # whether the latest agent step streamed (a preamble, or a reply; post-tool
+    # template replies never do)
+    step_streamed = False
+    turn_started = time.perf_counter()
+    first_chunk_at: Optional[float] = None
+
+    async def send_interim(text: str) -> bool:
+        # spoken filler while tools run; not part of the answer. Skipped when the
+        # model already streamed a preamble for this tool step (two fillers)
+        if step_streamed:
+            metrics.incr("interim_suppressed")
+            return False
+        if websocket.client_state != WebSocketState.CONNECTED:
+            return False
+        await websocket.send_text(json.dumps({"type": "interim", "text": text}))
+        metrics.observe("time_to_interim_ms", (time.perf_counter() - turn_started) * 1000)
+        return True
+
+    _interim_sender.set(send_interim)
+
+    async def send_chunk(text: str, extra: Optional[dict] = None) -> None:
+        nonlocal first_chunk_at
+        if websocket.client_state != WebSocketState.CONNECTED:
+            return
+        payload = {"type": "chunk", "text": text}
+        if extra:
+            payload.update(extra)
+        await websocket.send_text(json.dumps(payload))
+        print(payload)
+        if first_chunk_at is None and text:
+            first_chunk_at = time.perf_counter()
+            tracing.mark("first_chunk")
+            metrics.observe("time_to_first_chunk_ms",
+                            (first_chunk_at - turn_started) * 1000)
+
     try:
         if websocket.client_state == WebSocketState.CONNECTED:
             await websocket.send_text(json.dumps({"type": "start", "text": ""}))
 
         prev_len = len(state["messages"])
+        chunker = SentenceChunker()
+        streamed_any = False
+        result = None
+
+        async def run_graph():
+            nonlocal streamed_any, step_streamed, result
+            async for event in app.astream_events(state, version="v2"):
+                kind = event["event"]
+                if kind == "on_chain_start" and event.get("name") == "agent":
+                    step_streamed = False
+                elif kind == "on_chat_model_stream" and event.get("metadata", {}).get("langgraph_node") == "agent":
+                    token = getattr(event["data"]["chunk"], "content", "")
+                    if not isinstance(token, str) or not token:
+                        continue
+                    step_streamed = True
+                    for sentence in chunker.feed(token):
+                        text = clean_spoken_text(sentence, pad_short=False)
+                        if text:
+                            streamed_any = True
+                            await send_chunk(text)
+                elif kind == "on_chain_end" and not event.get("parent_ids"):
+                    result = event["data"]["output"]
+
         # keep timeout generous, turns are already gated by AAI
-        result = await asyncio.wait_for(app.ainvoke(state), timeout=108.0)
+        tracing.mark("graph_start")
+        await asyncio.wait_for(run_graph(), timeout=108.0)
+        if result is None:
+            raise RuntimeError("agent graph finished without a result")
 
         new_messages = result["messages"][prev_len:]
-        standby_flag = False
-
-        for msg in new_messages:
-            if isinstance(msg, ToolMessage):
-                try:
-                    data = json.loads(msg.content)
-                    if data.get("standby") is True:
-                        standby_flag = True
-                        break
-                except Exception:
-                    continue
-
-        if websocket.client_state == WebSocketState.CONNECTED and result.get("response"):
-            # --- Advanced Conversational Guardrails ---
-            import random
-            def smart_humanize(text, transcript=None, result_obj=None):
-                # Remove asterisks
-                text = text.replace("*", "")
-                # Remove unsupported symbols
-                import re
-                text = re.sub(r"[^a-zA-Z0-9 .,?!'\"\n:-]", "", text)
-                # # Add varied sentence starters
-                # starters = ["Alright,", "Okay,", "Well,", "Here's what I found:", "Let's see:", "Just a moment:", "Hmm,"]
-                # if text and not text.lower().startswith(tuple(s.lower() for s in starters)):
-                #     text = text[0].lower() + text[1:]
-                # Add context-aware follow-up
-                if transcript:
-                    if "time" in transcript.lower() and result_obj and "local_time" in result_obj:
-                        text += f" By the way, your local time is {result_obj['local_time']}."
-                    # if "reminder" in transcript.lower():
-                    #     text += " If you'd like to adjust the reminder, just let me know."
-                    # if "task" in transcript.lower():
-                    #     text += " You can always ask for your pending or completed tasks."
-                # Avoid robotic/short responses
-                if len(text) < 15:
-                    text += " If you need more details, just ask."
-                # Make sure it doesn't sound dumb
-                text = text.replace("sorry", "Let's see what we can do.")
-                return text.strip()
-
-            # If the response contains a raw error, replace with a natural, helpful message
-            error_phrases = ["oops, something broke", "connection error", "error:", "exception:"]
-            cleaned_response = smart_humanize(result["response"], state["transcript"], result)
-            if any(e in cleaned_response.lower() for e in error_phrases):
-                cleaned_response = "Hmm, it looks like something went wrong connecting to the service. Let's try again in a moment, or you can ask me about something else."
-            payload = {"type": "chunk", "text": cleaned_response.replace("*","")}
-            if standby_flag:
-                payload["standby"] = True
-            if "task" in result:
-                payload["task"] = result["task"]
-            if "summary" in result:
-                payload['summary'] = result['summary']
-            await websocket.send_text(json.dumps(payload))
-            print(payload)
-            if not standby_flag:
+        standby_flag = _is_standby(new_messages)
+
+        extra = {}
+        if standby_flag:
+            extra["standby"] = True
+        if "task" in result:
+            extra["task"] = result["task"]
+        if "summary" in result:
+            extra['summary'] = result['summary']
+
+        if websocket.client_state == WebSocketState.CONNECTED:
+            remainder = chunker.flush()
+            if streamed_any and not step_streamed and result.get("response"):
+                # a preamble was streamed but the final reply was not (post-tool template)
+                text = clean_spoken_text(remainder, pad_short=False) if remainder else ""
+                if text:
+                    await send_chunk(text)
+                await send_chunk(clean_spoken_text(result["response"], state["transcript"], result), extra)
+            elif streamed_any:
+                text = clean_spoken_text(remainder, pad_short=False) if remainder else ""
+                # the last chunk carries the turn metadata (standby/task/summary)
+                if text or extra:
+                    await send_chunk(text, extra)
+            elif result.get("response"):
+                # nothing was streamed (e.g. error path): send the whole response at once
+                await send_chunk(clean_spoken_text(result["response"], state["transcript"], result), extra)
+
+            if (streamed_any or result.get("response")) and not standby_flag:
                 await asyncio.sleep(0.02)
                 await websocket.send_text(json.dumps({"type": "end", "text": ""}))
 
-        # Trim memory (keep recent dialog; drop system to reduce bloat)
-        trimmed_messages = [m for m in result["messages"]
-                            if not isinstance(m, SystemMessage)]
-        if len(trimmed_messages) > 12:
-            start_index = len(trimmed_messages) - 12
-            while start_index > 0 and isinstance(trimmed_messages[start_index], ToolMessage):
-                start_index -= 1
-            trimmed_messages = trimmed_messages[start_index:]
-        session_memory[session_id]["conversation"] = trimmed_messages
+        metrics.incr("turns")
+        metrics.observe("llm_calls_per_turn", session_memory[session_id].get("turn_llm_calls", 0))
+        metrics.observe("turn_total_ms", (time.perf_counter() - turn_started) * 1000)
 
-        # Clean up the session state when done (optional - you might want to keep it longer)
-        # AgentStateRegistry.cleanup_session(session_id)
+        store_turn(session_memory[session_id], result["messages"], new_messages)
 
     except asyncio.TimeoutError:
+        metrics.incr("turn_timeouts")
+        tracing.set_status("timeout")
         if websocket.client_state == WebSocketState.CONNECTED:
             await websocket.send_text(json.dumps({
                 "type": "error",
@@ -804,6 +1148,7 @@ async def process_transcript_streaming(
             }))
 
     except Exception as e:
+        tracing.set_status("error")
         if websocket.client_state == WebSocketState.CONNECTED:
             await websocket.send_text(json.dumps({
                 "type": "error",
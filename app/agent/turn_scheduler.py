@@ -0,0 +1,120 @@
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+from app.agent import metrics
+
+USER_TURN = "user"
+SCHEDULED_TURN = "scheduled"
+
+
+class TurnScheduler:
+    """
+    Per-session turn queue: at most one agent run in flight, the user's own
+    turns always go before scheduler triggers.
+
+    - a final arriving while another user final is still queued is merged into it
+    - a final arriving while a turn is running cancels it (barge-in); if the
+      cancelled user turn started less than `coalesce_window` seconds ago the
+      two utterances are merged, since the user was most likely still talking
+    - scheduled triggers wait behind user turns; one interrupted by a barge-in
+      is put back at the head of the scheduled queue
+    """
+
+    def __init__(self, run_turn: Callable[[str], Awaitable[None]],
+                 on_interrupt: Optional[Callable[[], Awaitable[None]]] = None,
+                 coalesce_window: float = 1.5):
+        self._run_turn = run_turn
+        self._on_interrupt = on_interrupt
+        self.coalesce_window = coalesce_window
+
+        self._pending_user: Optional[str] = None
+        self._pending_scheduled: deque = deque()
+        self._wakeup = asyncio.Event()
+        self._worker: Optional[asyncio.Task] = None
+
+        self._inflight: Optional[asyncio.Task] = None
+        self._inflight_kind: Optional[str] = None
+        self._inflight_text = ""
+        self._inflight_started = 0.0
+
+    @property
+    def busy(self) -> bool:
+        return self._inflight is not None and not self._inflight.done()
+
+    def start(self) -> None:
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    def submit_user(self, text: str) -> None:
+        """Queue a user final; barges in on whatever is currently running."""
+        if self.busy:
+            if (self._inflight_kind == USER_TURN
+                    and time.monotonic() - self._inflight_started < self.coalesce_window):
+                text = f"{self._inflight_text} {text}"
+                metrics.incr("turns_coalesced")
+            self._inflight.cancel()
+            metrics.incr("barge_ins")
+
+        if self._pending_user:
+            text = f"{self._pending_user} {text}"
+            metrics.incr("turns_coalesced")
+        self._pending_user = text.strip()
+        self._wakeup.set()
+
+    def submit_scheduled(self, text: str) -> None:
+        """Queue a scheduler trigger; safe to call via loop.call_soon_threadsafe."""
+        self._pending_scheduled.append(text)
+        metrics.incr("scheduled_turns_queued")
+        self._wakeup.set()
+
+    def _next_turn(self):
+        if self._pending_user:
+            text, self._pending_user = self._pending_user, None
+            return USER_TURN, text
+        if self._pending_scheduled:
+            return SCHEDULED_TURN, self._pending_scheduled.popleft()
+        return None
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+
+            while True:
+                turn = self._next_turn()
+                if turn is None:
+                    break
+                kind, text = turn
+
+                self._inflight_kind = kind
+                self._inflight_text = text
+                self._inflight_started = time.monotonic()
+                self._inflight = asyncio.create_task(self._run_turn(text))
+                # asyncio.wait does not raise when the turn itself is cancelled
+                await asyncio.wait([self._inflight])
+
+                if self._inflight.cancelled():
+                    metrics.incr("turns_interrupted")
+                    if kind == SCHEDULED_TURN:
+                        self._pending_scheduled.appendleft(text)
+                    if self._on_interrupt is not None:
+                        try:
+                            await self._on_interrupt()
+                        except Exception as e:
+                            print(f"Error notifying interrupt: {e}")
+                elif self._inflight.exception() is not None:
+                    print(f"Error processing turn: {self._inflight.exception()}")
+                self._inflight = None
+
+    async def close(self) -> None:
+        for task in (self._inflight, self._worker):
+            if task is not None and not task.done():
+                task.cancel()
+        for task in (self._inflight, self._worker):
+            if task is not None:
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
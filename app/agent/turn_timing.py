@@ -0,0 +1,136 @@
+import time
+from typing import Any, Dict, Optional
+
+from app.config import settings
+from app.agent import metrics
+from app.db.models.user import User
+from app.db.session import run_db
+
+# AssemblyAI v3 end-of-turn parameters and what everyone starts with
+DEFAULT_TURN_TIMING = {
+    "end_of_turn_confidence_threshold": 0.75,
+    "min_end_of_turn_silence_when_confident": 500,
+    "max_turn_silence": 2000,
+}
+# parameter -> (lowest, highest, step)
+TURN_TIMING_BOUNDS = {
+    "end_of_turn_confidence_threshold": (0.5, 0.9, 0.05),
+    "min_end_of_turn_silence_when_confident": (200, 1200, 100),
+    "max_turn_silence": (1000, 4000, 250),
+}
+# User columns holding the tuned values
+USER_COLUMNS = {
+    "end_of_turn_confidence_threshold": "eot_confidence_threshold",
+    "min_end_of_turn_silence_when_confident": "eot_min_silence_ms",
+    "max_turn_silence": "eot_max_silence_ms",
+}
+
+SHORT_FINAL_WORDS = 3
+RATE_SMOOTHING = 0.3
+# smoothed cut-off rate above which turns are closed later / below which earlier
+CUTOFF_RATE_HIGH = 0.15
+CUTOFF_RATE_LOW = 0.04
+
+
+def turn_timing_for(user: Any) -> Dict[str, Any]:
+    """StreamingParameters end-of-turn values for a user (defaults for anything not tuned yet)."""
+    timing = dict(DEFAULT_TURN_TIMING)
+    for param, column in USER_COLUMNS.items():
+        value = getattr(user, column, None)
+        if value is not None:
+            timing[param] = value
+    return timing
+
+
+class TurnTimingTracker:
+    """
+    Watches one session's turn timing for signs the endpointing is off.
+
+    A final followed by more speech within JARVIS_EOT_CUTOFF_WINDOW_MS means
+    the user was cut off mid-thought (they re-prompt / continue); short
+    finals get twice the window. Turns with no such continuation are clean,
+    and a run of clean turns lets the endpointing get faster.
+    """
+
+    def __init__(self, timing: Dict[str, Any]):
+        self.timing = timing
+        self.turns = 0
+        self.cutoffs = 0
+        self.short_finals = 0
+        self._last_final_at: Optional[float] = None
+        self._last_final_short = False
+
+    def on_final(self, text: str) -> None:
+        self.turns += 1
+        self._last_final_at = time.monotonic()
+        self._last_final_short = len(text.split()) < SHORT_FINAL_WORDS
+        if self._last_final_short:
+            self.short_finals += 1
+
+    def on_speech(self) -> None:
+        """First partial after a final: did the user just keep talking?"""
+        if self._last_final_at is None:
+            return
+        gap_ms = (time.monotonic() - self._last_final_at) * 1000
+        window = settings.JARVIS_EOT_CUTOFF_WINDOW_MS * (2 if self._last_final_short else 1)
+        self._last_final_at = None
+        if gap_ms <= window:
+            self.cutoffs += 1
+            metrics.incr("eot_cutoffs")
+            metrics.observe("eot_cutoff_gap_ms", gap_ms)
+
+
+def _step(timing: Dict[str, Any], direction: int) -> Dict[str, Any]:
+    tuned = {}
+    for param, (low, high, step) in TURN_TIMING_BOUNDS.items():
+        value = min(high, max(low, timing[param] + direction * step))
+        tuned[param] = round(value, 2) if isinstance(step, float) else int(value)
+    return tuned
+
+
+def learn_turn_timing(db, user_id: int, turns: int, cutoffs: int, short_finals: int) -> Optional[Dict[str, Any]]:
+    """
+    Fold one session's observations into the user's stored tuning (runs via run_db).
+
+    The cut-off rate is smoothed across sessions; above CUTOFF_RATE_HIGH the
+    turn closes later, below CUTOFF_RATE_LOW it closes earlier, one step at a
+    time. Users with an explicit override are left alone.
+    """
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is None or user.turn_timing_override:
+        return None
+
+    stats = dict(user.turn_timing_stats or {})
+    stats["turns"] = stats.get("turns", 0) + turns
+    stats["cutoffs"] = stats.get("cutoffs", 0) + cutoffs
+    stats["short_finals"] = stats.get("short_finals", 0) + short_finals
+    rate = cutoffs / turns
+    previous = stats.get("cutoff_rate")
+    stats["cutoff_rate"] = round(rate if previous is None else
+                                 previous + RATE_SMOOTHING * (rate - previous), 3)
+
+    timing = turn_timing_for(user)
+    if stats["cutoff_rate"] > CUTOFF_RATE_HIGH:
+        timing = _step(timing, +1)
+    elif stats["cutoff_rate"] < CUTOFF_RATE_LOW:
+        timing = _step(timing, -1)
+
+    for param, column in USER_COLUMNS.items():
+        setattr(user, column, timing[param])
+    # reassign so the JSON column is marked dirty
+    user.turn_timing_stats = stats
+    db.commit()
+    return timing
+
+
+async def save_turn_timing(user_id: int, tracker: TurnTimingTracker) -> None:
+    """End-of-session hook: learn from the session if it had enough turns."""
+    if not settings.JARVIS_TURN_TIMING_ADAPTIVE or tracker.turns < settings.JARVIS_TURN_TIMING_MIN_TURNS:
+        return
+    try:
+        timing = await run_db(learn_turn_timing, user_id, tracker.turns, tracker.cutoffs, tracker.short_finals)
+        if timing:
+            print(f"Turn timing for user {user_id}: {timing} "
+                  f"({tracker.cutoffs} cut-offs in {tracker.turns} turns)")
+    except Exception as e:
+        print(f"Error saving turn timing: {e}")
@@ -0,0 +1,133 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+from zoneinfo import ZoneInfo
+
+from app.config import settings
+from app.agent.user_memory import read_facts, top_facts
+from app.db.models.user import User
+from app.db.session import run_db
+from app.api.todo.task.services import search_tasks_async
+from app.api.todo.project.services import search_projects_async
+
+# How long preloaded DB data stays fresh; write tools also mark it stale
+CONTEXT_TTL_SECONDS = 120
+MAX_CONTEXT_TASKS = 15
+MAX_CONTEXT_PROJECTS = 50
+
+
+def read_user_timezone(user_id: int, db) -> Optional[str]:
+    user = db.query(User).filter(User.id == user_id).first()
+    return user.timezone if user else None
+
+
+def resolve_timezone(tz_name: Optional[str]) -> ZoneInfo:
+    for candidate in (tz_name, (tz_name or "").upper()):
+        if not candidate:
+            continue
+        try:
+            return ZoneInfo(candidate)
+        except Exception:
+            continue
+    return ZoneInfo("UTC")
+
+
+async def load_user_context(user_id: int) -> Dict[str, Any]:
+    """Fetch projects, the soonest pending tasks, stored facts and timezone in parallel."""
+    projects, tasks, facts, tz_name = await asyncio.gather(
+        search_projects_async(user_id=user_id, limit=MAX_CONTEXT_PROJECTS),
+        search_tasks_async(user_id=user_id, status="pending", limit=MAX_CONTEXT_TASKS),
+        run_db(read_facts, user_id),
+        run_db(read_user_timezone, user_id),
+    )
+    return {
+        "projects": [
+            (p["id"], p["name"], bool(p.get("is_inbox_project"))) for p in projects["projects"]
+        ],
+        "pending_tasks": [
+            (t["id"], t["content"], t.get("due_date"), t.get("priority"), t.get("project_id"))
+            for t in tasks["tasks"]
+        ],
+        "pending_total": tasks["total"],
+        # all facts (capped by JARVIS_MEMORY_MAX_FACTS); each turn shows only the relevant ones
+        "facts": facts,
+        "timezone": tz_name,
+        "loaded_at": time.monotonic(),
+    }
+
+
+def _refresh_in_background(session: Dict[str, Any]) -> asyncio.Task:
+    task = asyncio.create_task(load_user_context(session["user_id"]))
+    session["user_context_task"] = task
+    session["user_context_stale"] = False
+    return task
+
+
+def start_preload(session: Dict[str, Any]) -> None:
+    """Kick off the context load when the websocket session is created."""
+    _refresh_in_background(session)
+
+
+def mark_stale(session: Dict[str, Any]) -> None:
+    """Called by write tools so the next turn reloads tasks/projects."""
+    session["user_context_stale"] = True
+
+
+async def get_user_context(session: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    task = session.get("user_context_task")
+    cached = session.get("user_context")
+    expired = cached is not None and time.monotonic() - cached["loaded_at"] > CONTEXT_TTL_SECONDS
+
+    failed = task is not None and task.done() and (task.cancelled() or task.exception() is not None)
+    if task is None or failed or session.get("user_context_stale") or (expired and task.done()):
+        task = _refresh_in_background(session)
+
+    try:
+        session["user_context"] = await asyncio.shield(task)
+    except Exception as e:
+        print(f"Error loading user context: {e}")
+    return session.get("user_context")
+
+
+def format_context_block(session: Dict[str, Any], context: Optional[Dict[str, Any]], query: str = "") -> str:
+    """Compact context block appended to the system prompt; the time line is rebuilt every turn."""
+    tz_name = session.get("timezone")
+    if context and (not tz_name or tz_name.lower() == "utc") and context.get("timezone"):
+        tz_name = context["timezone"]
+    local_tz = resolve_timezone(tz_name)
+    now_utc = datetime.now(timezone.utc)
+    now_local = now_utc.astimezone(local_tz)
+
+    lines = [
+        "## User Context (preloaded, already up to date)",
+        f"- Current local time: {now_local.strftime('%Y-%m-%d %H:%M (%A)')} "
+        f"{local_tz.key} UTC{now_local.strftime('%z')}; UTC time: {now_utc.strftime('%Y-%m-%d %H:%M')}",
+    ]
+    if context is None:
+        return "\n".join(lines)
+
+    if context["projects"]:
+        projects = ", ".join(
+            f"{pid}: {name}{' (inbox)' if inbox else ''}" for pid, name, inbox in context["projects"]
+        )
+        lines.append(f"- Projects (id: name): {projects}")
+    else:
+        lines.append("- Projects: none")
+
+    shown = context["pending_tasks"][:MAX_CONTEXT_TASKS]
+    lines.append(
+        f"- Pending tasks ({context['pending_total']} total"
+        f"{', showing ' + str(len(shown)) if context['pending_total'] > len(shown) else ''}):"
+    )
+    for task_id, content, due_date, priority, project_id in shown:
+        due = f", due {due_date}" if due_date else ""
+        lines.append(f"  - #{task_id} {content} (p{priority}, project {project_id}{due})")
+
+    facts = top_facts(context.get("facts") or [], query, settings.JARVIS_MEMORY_CONTEXT_TOP_K)
+    if facts:
+        more = len(context["facts"]) - len(facts)
+        lines.append(f"- Stored info about the user{f' (most relevant; {more} more stored)' if more > 0 else ''}:")
+        lines.extend(f"  - {fact}" for fact in facts)
+
+    return "\n".join(lines)
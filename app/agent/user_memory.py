@@ -0,0 +1,155 @@
+import math
+import re
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.agent import metrics
+from app.db.models.user_info import UserInfo
+
+# (id, text) of a stored fact, most recently updated first
+Fact = Tuple[int, str]
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+# character-trigram overlap adds a little score for typos / word forms BM25 misses
+TRIGRAM_WEIGHT = 0.5
+MIN_TRIGRAM_MATCH = 0.35
+
+_WORD = re.compile(r"[a-z0-9]+")
+# numbers and capitalised words: what tells "June 3" from "June 30" or Monday from Tuesday
+_KEY_TOKEN = re.compile(r"\d+|\b[A-Z][A-Za-z]*")
+STOPWORDS = frozenset("""
+a an the and or but if of to in on at for from by with about as is are was were be been being
+i me my mine you your yours he she it its we our they them their this that these those what which
+who whom when where why how do does did have has had will would can could should shall may might
+user users s not no so than then there here just very please tell remember know
+""".split())
+
+
+def _stem(word: str) -> str:
+    for suffix in ("ing", "ies", "es", "ed", "s"):
+        if len(word) > len(suffix) + 2 and word.endswith(suffix):
+            return word[:-len(suffix)] + ("y" if suffix == "ies" else "")
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    return [_stem(w) for w in _WORD.findall((text or "").lower()) if w not in STOPWORDS]
+
+
+def trigrams(text: str) -> set:
+    padded = f"  {' '.join(_WORD.findall((text or '').lower()))} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a: str, b: str) -> float:
+    """Dice coefficient of character trigrams (1.0 = same text up to case/punctuation)."""
+    ta, tb = trigrams(a), trigrams(b)
+    if not ta or not tb:
+        return 0.0
+    return 2 * len(ta & tb) / (len(ta) + len(tb))
+
+
+def is_duplicate(a: str, b: str) -> bool:
+    """
+    True only for restatements of the same fact: the same words up to
+    case/punctuation, or nearly identical text with the same numbers and
+    names. Similar facts about different things are kept apart.
+    """
+    if _WORD.findall(a.lower()) == _WORD.findall(b.lower()):
+        return True
+    return (similarity(a, b) >= settings.JARVIS_MEMORY_DEDUPE_SIMILARITY
+            and sorted(_KEY_TOKEN.findall(a)) == sorted(_KEY_TOKEN.findall(b)))
+
+
+def rank(facts: List[Fact], query: str) -> List[Tuple[float, Fact]]:
+    """BM25 over the user's own facts (plus trigram overlap); only facts that match at all."""
+    terms = set(tokenize(query))
+    if not facts or not terms:
+        return []
+    docs = [Counter(tokenize(text)) for _, text in facts]
+    avg_len = sum(sum(d.values()) for d in docs) / len(docs) or 1.0
+    df = Counter(t for d in docs for t in d.keys() & terms)
+    query_grams = trigrams(query)
+
+    scored = []
+    for fact, doc in zip(facts, docs):
+        length = sum(doc.values())
+        bm25 = 0.0
+        for t in terms & doc.keys():
+            idf = math.log(1 + (len(docs) - df[t] + 0.5) / (df[t] + 0.5))
+            tf = doc[t]
+            bm25 += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_len))
+        fact_grams = trigrams(fact[1])
+        overlap = len(query_grams & fact_grams) / len(fact_grams) if fact_grams else 0.0
+        if bm25 > 0 or overlap >= MIN_TRIGRAM_MATCH:
+            scored.append((bm25 + TRIGRAM_WEIGHT * overlap, fact))
+    scored.sort(key=lambda s: -s[0])
+    return scored
+
+
+def top_facts(facts: List[Fact], query: str, k: int, fill_recent: bool = True) -> List[str]:
+    """
+    The k facts most relevant to `query`; remaining slots go to the most
+    recently updated facts (names and such stay useful on unrelated turns).
+    """
+    picked = [fact for _, fact in rank(facts, query)[:k]]
+    if fill_recent:
+        seen = {fid for fid, _ in picked}
+        picked += [f for f in facts if f[0] not in seen][:k - len(picked)]
+    return [text for _, text in picked]
+
+
+def read_facts(user_id: int, db) -> List[Fact]:
+    rows = (db.query(UserInfo.id, UserInfo.info)
+            .filter(UserInfo.user_id == user_id)
+            .order_by(UserInfo.updated_at.desc(), UserInfo.id.desc())
+            .all())
+    return [(row.id, row.info) for row in rows]
+
+
+def save_fact(user_id: int, info: str, db) -> Dict[str, Any]:
+    """
+    Store one fact. A restatement of a stored fact (is_duplicate) replaces it
+    (the newer wording wins and its timestamp is refreshed); past
+    JARVIS_MEMORY_MAX_FACTS the least recently updated facts are evicted.
+    """
+    info = " ".join((info or "").split())
+    now = datetime.now(timezone.utc)
+    facts = db.query(UserInfo).filter(UserInfo.user_id == user_id).all()
+
+    best: Optional[UserInfo] = None
+    best_score = 0.0
+    for fact in facts:
+        score = similarity(fact.info, info)
+        if score > best_score and is_duplicate(fact.info, info):
+            best, best_score = fact, score
+
+    if best is not None:
+        best.info = info
+        best.updated_at = now
+        db.commit()
+        metrics.incr("memory_facts_deduped")
+        return {"status": "updated", "id": best.id, "evicted": 0}
+
+    fact = UserInfo(user_id=user_id, info=info, created_at=now, updated_at=now)
+    db.add(fact)
+    db.flush()
+
+    evicted = 0
+    overflow = len(facts) + 1 - settings.JARVIS_MEMORY_MAX_FACTS
+    if overflow > 0:
+        stale = (db.query(UserInfo.id)
+                 .filter(UserInfo.user_id == user_id, UserInfo.id != fact.id)
+                 .order_by(UserInfo.updated_at.asc(), UserInfo.id.asc())
+                 .limit(overflow)
+                 .all())
+        evicted = (db.query(UserInfo)
+                   .filter(UserInfo.id.in_([row.id for row in stale]))
+                   .delete(synchronize_session=False))
+        metrics.incr("memory_facts_evicted", evicted)
+    db.commit()
+    metrics.incr("memory_facts_saved")
+    return {"status": "saved", "id": fact.id, "evicted": evicted}
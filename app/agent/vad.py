@@ -0,0 +1,143 @@
+from typing import Callable
+
+import numpy as np
+
+from app.agent import metrics
+
+
+class EnergyVad:
+    """
+    Energy / zero-crossing voice activity gate for PCM16 mono frames.
+
+    Each frame is split into 10 ms sub-frames and scored in one vectorized
+    pass. Speech frames are forwarded together with the few silent frames that
+    preceded them (pre-roll, so word onsets are not clipped); after speech the
+    gate stays open for `hangover_ms` so the ASR still hears the trailing
+    silence it needs to close the turn, or until end_of_turn() is called.
+    While the gate is closed only a zero keep-alive frame is sent every
+    `keepalive_ms` so the ASR connection does not idle out.
+    """
+
+    def __init__(self, sample_rate: int = 16000, frame_bytes: int = 3200,
+                 energy_margin_db: float = 10.0, min_speech_dbfs: float = -50.0,
+                 hangover_ms: int = 2300, preroll_frames: int = 3,
+                 keepalive_ms: int = 5000):
+        self.subframe_samples = sample_rate // 100
+        self.frame_bytes = frame_bytes
+        frame_ms = frame_bytes * 1000 // (sample_rate * 2)
+        self.energy_margin_db = energy_margin_db
+        self.min_speech_dbfs = min_speech_dbfs
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+        self.keepalive_frames = max(1, keepalive_ms // frame_ms)
+
+        self.noise_floor_db = -65.0
+        self._hangover_left = 0
+        self._silent_run = 0
+
+        # preallocated pre-roll ring of recent suppressed frames
+        self._preroll = [bytearray(frame_bytes) for _ in range(preroll_frames)]
+        self._preroll_sizes = [0] * preroll_frames
+        self._preroll_next = 0
+        self._preroll_count = 0
+        self._zero_frame = bytes(frame_bytes)
+
+        self.frames_forwarded = 0
+        self.frames_suppressed = 0
+        self.bytes_forwarded = 0
+        self.bytes_suppressed = 0
+        self.keepalives_sent = 0
+
+    def is_speech(self, frame) -> bool:
+        samples = np.frombuffer(frame, dtype="<i2")
+        usable = len(samples) - len(samples) % self.subframe_samples
+        if usable == 0:
+            return False
+        sub = samples[:usable].reshape(-1, self.subframe_samples).astype(np.float32)
+
+        rms = np.sqrt(np.mean(sub * sub, axis=1)) + 1e-3
+        energy_db = 20.0 * np.log10(rms / 32768.0)
+        signs = np.signbit(sub)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / self.subframe_samples
+
+        threshold = max(self.noise_floor_db + self.energy_margin_db, self.min_speech_dbfs)
+        # voiced speech: loud enough; unvoiced onsets (s, f, sh): a bit quieter but noisy
+        voiced = energy_db > threshold
+        unvoiced = (energy_db > threshold - 6.0) & (zcr > 0.3) & (zcr < 0.7)
+        speech = bool(np.count_nonzero(voiced | unvoiced) >= 2)
+
+        quietest = float(np.min(energy_db))
+        if not speech:
+            self.noise_floor_db = 0.9 * self.noise_floor_db + 0.1 * quietest
+        elif quietest < self.noise_floor_db:
+            self.noise_floor_db = quietest
+        return speech
+
+    def process(self, frame, send: Callable) -> None:
+        """Gate one frame: pass it (and any pre-roll) to `send`, or hold it back."""
+        size = len(frame)
+        if self.is_speech(frame):
+            self._flush_preroll(send)
+            self._hangover_left = self.hangover_frames
+            self._forward(frame, size, send)
+            return
+
+        if self._hangover_left > 0:
+            self._hangover_left -= 1
+            self._forward(frame, size, send)
+            return
+
+        # suppressed: remember it for pre-roll, keep the ASR connection alive
+        slot = self._preroll_next
+        if self._preroll:
+            self._preroll[slot][:size] = frame
+            self._preroll_sizes[slot] = size
+            self._preroll_next = (slot + 1) % len(self._preroll)
+            self._preroll_count = min(self._preroll_count + 1, len(self._preroll))
+        self.frames_suppressed += 1
+        self.bytes_suppressed += size
+        metrics.incr("asr_frames_suppressed")
+
+        self._silent_run += 1
+        if self._silent_run >= self.keepalive_frames:
+            self._silent_run = 0
+            self.keepalives_sent += 1
+            send(self._zero_frame)
+
+    def end_of_turn(self) -> None:
+        """The ASR closed the turn: stop forwarding trailing silence."""
+        self._hangover_left = 0
+
+    def _forward(self, frame, size: int, send: Callable) -> None:
+        self._silent_run = 0
+        self.frames_forwarded += 1
+        self.bytes_forwarded += size
+        metrics.incr("asr_frames_forwarded")
+        send(frame)
+
+    def _flush_preroll(self, send: Callable) -> None:
+        count = self._preroll_count
+        if not count:
+            return
+        total = len(self._preroll)
+        start = (self._preroll_next - count) % total
+        for i in range(count):
+            slot = (start + i) % total
+            size = self._preroll_sizes[slot]
+            # these were counted as suppressed when they were held back
+            self.frames_suppressed -= 1
+            self.bytes_suppressed -= size
+            metrics.incr("asr_frames_suppressed", -1)
+            self._forward(memoryview(self._preroll[slot])[:size], size, send)
+        self._preroll_count = 0
+
+    def stats(self) -> dict:
+        total = self.bytes_forwarded + self.bytes_suppressed
+        return {
+            "frames_forwarded": self.frames_forwarded,
+            "frames_suppressed": self.frames_suppressed,
+            "bytes_forwarded": self.bytes_forwarded,
+            "bytes_suppressed": self.bytes_suppressed,
+            "keepalives_sent": self.keepalives_sent,
+            "suppressed_ratio": round(self.bytes_suppressed / total, 3) if total else 0.0,
+            "noise_floor_db": round(self.noise_floor_db, 1),
+        }
@@ -1,5 +1,6 @@
 import asyncio
 import json
+import time
 import uuid
 from datetime import datetime
 from typing import Dict, Any, Optional
@@ -13,10 +14,20 @@ from assemblyai.streaming.v3 import (
     TurnEvent,
 )
 
-from app.agent.transcript_processor import process_transcript_streaming
+from app.agent.transcript_processor import process_transcript_streaming, store_turn, AgentStateRegistry
+from app.agent.user_context import start_preload
+from app.agent.conversation_memory import close_session_memory
+from app.agent.turn_scheduler import TurnScheduler
+from app.agent.speculation import Speculator, normalize as normalize_transcript
+from app.agent.audio_egress import AudioEgress
+from app.agent.captions import CaptionEmitter
+from app.agent.session_state import enforce_budget, touch, account, hibernate, idle_sessions
+from app.agent.vad import EnergyVad
+from app.agent.turn_timing import TurnTimingTracker, turn_timing_for, save_turn_timing
 from app.config import settings
-from app.core.security import get_current_user_for_ws
-from app.db.session import get_db, get_db_context
+from app.core.security import get_user_for_ws_token
+from app.core.session_registry import get_registry
+from app.db.session import get_db, get_db_context, run_db
 
 # Global session memory
 session_memory: Dict[str, Dict[str, Any]] = {}
@@ -27,17 +38,24 @@ async def websocket_endpoint(websocket: WebSocket):
     print("recived request")
     session_id: Optional[str] = None
     transcriber: Optional[StreamingClient] = None
+    egress: Optional[AudioEgress] = None
+    vad: Optional[EnergyVad] = None
+    speculator: Optional[Speculator] = None
     user_id: Optional[int] = None
+    timing_tracker: Optional[TurnTimingTracker] = None
+    captions: Optional[CaptionEmitter] = None
     auth_token = websocket._query_params.get("token")
 
     try:
-        with get_db_context() as db:
-            user = await get_current_user_for_ws(token=auth_token, db=db)
-            if user:
-                user_id = user.id
-            else:
-                print("User not found or token is invalid")
-                return
+        # runs in the DB thread pool so other sessions keep streaming
+        def verify(db):
+            user = get_user_for_ws_token(token=auth_token, db=db)
+            return user.id, turn_timing_for(user)
+
+        user_id, turn_timing = await run_db(verify)
+        if not user_id:
+            print("User not found or token is invalid")
+            return
     except Exception as e:
         print(f"Error verifying token: {e}")
         return
@@ -70,8 +88,7 @@ async def websocket_endpoint(websocket: WebSocket):
         session_memory[session_id] = {
             "user_id": user_id,
             "websocket": websocket,
-            "projects": projects,
-            "tasks": tasks,
+            # tasks/projects are read from the DB (user context, tools), not kept here
             "reports": reports,
             "usrIp": websocket.client.host,
             "timezone": preProcessData.get("timezone", "utc"),
@@ -79,6 +96,19 @@ async def websocket_endpoint(websocket: WebSocket):
             # per-session ASR partial buffer
             "partial_buffer": "",
         }
+        touch(session_memory[session_id])
+        enforce_budget(session_memory[session_id])
+
+        # live captions, rate-limited; clients sending {"captions": "delta"} get only the changes
+        captions = CaptionEmitter(
+            websocket,
+            max_hz=settings.JARVIS_CAPTION_MAX_HZ,
+            delta=preProcessData.get("captions") == "delta",
+        )
+        session_memory[session_id]["captions"] = captions
+
+        # Load projects, pending tasks, stored info and timezone while the transcriber connects
+        start_preload(session_memory[session_id])
 
         print(f"Session created with ID: {session_id}")
 
@@ -89,8 +119,60 @@ async def websocket_endpoint(websocket: WebSocket):
         session_memory[session_id]["loop"] = loop
         
         last_transcript = None
-        is_processing = False
-        processing_lock = asyncio.Lock()
+
+        async def run_turn(text: str):
+            try:
+                if speculator:
+                    # the answer may already be running from a stable partial
+                    spec = speculator.claim(text)
+                    if spec is not None and await speculator.commit(spec, store_turn):
+                        # traced as the speculative turn
+                        session_memory[session_id].pop("asr_final_at", None)
+                        return
+                print(f"Processing final transcript: {text}")
+                await process_transcript_streaming(
+                    websocket, session_id, text, session_memory
+                )
+            except Exception as e:
+                print(f"Error processing transcript: {e}")
+                if websocket.client_state == WebSocketState.CONNECTED:
+                    try:
+                        await websocket.send_text(json.dumps({"type": "error", "text": f"Processing error: {str(e)}"}))
+                    except Exception:
+                        pass
+
+        async def on_interrupt():
+            # tell the client to drop the rest of the interrupted answer
+            if websocket.client_state == WebSocketState.CONNECTED:
+                try:
+                    await websocket.send_text(json.dumps({"type": "end", "text": "", "interrupted": True}))
+                except Exception:
+                    pass
+
+        # one agent run in flight per session; finals coalesce / barge in,
+        # scheduler triggers queue behind the user's own turns
+        turns = TurnScheduler(run_turn, on_interrupt)
+        turns.start()
+        session_memory[session_id]["turns"] = turns
+
+        # visible to every worker; scheduler triggers for this user are routed here
+        # (only now that there is a scheduler to queue them on)
+        try:
+            await get_registry().register(
+                session_id, user_id, timezone=session_memory[session_id]["timezone"])
+        except Exception as e:
+            print(f"Error registering session: {e}")
+
+        if settings.JARVIS_SPECULATION_ENABLED:
+            async def run_shadow(socket, shadow_memory, text: str):
+                await process_transcript_streaming(socket, session_id, text, shadow_memory)
+
+            speculator = Speculator(
+                websocket, session_id, session_memory, run_shadow,
+                can_start=lambda: not turns.busy,
+                stable_ms=settings.JARVIS_SPECULATION_STABLE_MS,
+                min_chars=settings.JARVIS_SPECULATION_MIN_CHARS,
+            )
 
         async def handle_turn(event: TurnEvent):
             """
@@ -98,7 +180,7 @@ async def websocket_endpoint(websocket: WebSocket):
             We must ignore intermediate partials for agent invocation,
             buffer them for live captions, and only call the agent on finals.
             """
-            nonlocal last_transcript, is_processing
+            nonlocal last_transcript
 
             # defensive fetch of transcript text
             text = ""
@@ -138,12 +220,11 @@ async def websocket_endpoint(websocket: WebSocket):
                     if session is not None:
                         # keep a running partial buffer (overwrite with newest partial)
                         session["partial_buffer"] = text
-                        # Optionally forward partial captions to client without invoking agent:
-                        if websocket.client_state == WebSocketState.CONNECTED:
-                            try:
-                                await websocket.send_text(json.dumps({"type": "asr_partial", "text": text}))
-                            except Exception:
-                                pass
+                        timing_tracker.on_speech()
+                        if speculator:
+                            speculator.on_partial(text)
+                        # forward partial captions to the client without invoking the agent
+                        captions.push(text)
                 return  # do NOT call the agent on partials
 
             # At this point this event is final: combine buffer + final defensively
@@ -153,7 +234,7 @@ async def websocket_endpoint(websocket: WebSocket):
 
             # Combine any buffered partial with final text for robustness
             buffered = session.get("partial_buffer", "") or ""
-            if buffered and buffered != text:
+            if buffered and buffered != text and normalize_transcript(buffered) not in normalize_transcript(text):
                 # sometimes final includes the full text already; avoid duplication
                 full_text = (buffered + " " + text).strip()
             else:
@@ -161,6 +242,11 @@ async def websocket_endpoint(websocket: WebSocket):
 
             # Clear buffer now that final has arrived
             session["partial_buffer"] = ""
+            touch(session)
+            captions.reset()
+            if vad:
+                # the turn is closed, trailing silence no longer needs forwarding
+                vad.end_of_turn()
 
             # Ignore tiny/empty finals
             if not full_text or len(full_text.strip()) < 4:
@@ -175,40 +261,19 @@ async def websocket_endpoint(websocket: WebSocket):
             # De-duplication
             if full_text == last_transcript:
                 return
+            last_transcript = full_text
+            timing_tracker.on_final(full_text)
 
-            # concurrency guard: only one in-flight model call per session
-            async with processing_lock:
-                if is_processing:
-                    # if already processing, drop this final (or you could enqueue)
-                    return
-                # mark processing inside lock
-                nonlocal_is_processing_marker = True
-
-            # We'll set is_processing via a small local pattern (to ensure release)
-            try:
-                # set flag
-                is_processing = True
-                last_transcript = full_text
-
-                print(f"Processing final transcript: {full_text}")
-                await process_transcript_streaming(
-                    websocket, session_id, full_text, session_memory
-                )
-            except Exception as e:
-                print(f"Error processing transcript: {e}")
-                if websocket.client_state == WebSocketState.CONNECTED:
-                    try:
-                        await websocket.send_text(json.dumps({"type": "error", "text": f"Processing error: {str(e)}"}))
-                    except Exception:
-                        pass
-            finally:
-                is_processing = False
-                # small yield so rapid back-to-back turns don’t collide
-                await asyncio.sleep(0.08)
+            # the turn's trace is timed from here
+            session["asr_final_at"] = time.perf_counter()
+            # never dropped: queued, coalesced, or barging in on the running turn
+            turns.submit_user(full_text)
 
         def on_error(_client, error):
             print(f"AssemblyAI error: {error}")
 
+        timing_tracker = TurnTimingTracker(turn_timing)
+
         # Create and start transcriber (v3)
         try:
             transcriber = StreamingClient(
@@ -223,19 +288,30 @@ async def websocket_endpoint(websocket: WebSocket):
             )
             transcriber.on(StreamingEvents.Error, on_error)
 
-            # Connect with tuned parameters (keep format_turns True)
+            # Connect with the user's end-of-turn tuning (keep format_turns True)
             transcriber.connect(
                 StreamingParameters(
                     sample_rate=16000,
                     encoding="pcm_s16le",
                     format_turns=True,
-                    end_of_turn_confidence_threshold=0.75,
-                    min_end_of_turn_silence_when_confident=500,
-                    max_turn_silence=2000,
+                    **turn_timing,
                 )
             )
 
-            print("Transcriber connected successfully (v3)")
+            print(f"Transcriber connected successfully (v3), end of turn: {turn_timing}")
+
+            # audio goes to AssemblyAI from a bounded queue on its own thread
+            egress = AudioEgress(
+                transcriber.stream,
+                max_slots=settings.JARVIS_AUDIO_QUEUE_SLOTS,
+                name=f"audio-egress-{session_id[:8]}",
+            )
+            session_memory[session_id]["audio_egress"] = egress
+
+            if settings.JARVIS_VAD_ENABLED:
+                # hang over past max_turn_silence so the ASR can still close the turn
+                vad = EnergyVad(hangover_ms=turn_timing["max_turn_silence"] + 300)
+                session_memory[session_id]["vad"] = vad
         except Exception as e:
             print(f"Error creating v3 transcriber: {e}")
             await websocket.close(code=1011, reason="Transcriber setup failed")
@@ -255,6 +331,13 @@ async def websocket_endpoint(websocket: WebSocket):
             IDLE_FLUSH_MS = 180
             IDLE_FLUSH_TIMEOUT = IDLE_FLUSH_MS / 1000.0
 
+            def send_frame(frame):
+                # silent frames are held back by the VAD instead of going to the ASR
+                if vad:
+                    vad.process(frame, egress.submit)
+                else:
+                    egress.submit(frame)
+
             while True:
                 if websocket.client_state != WebSocketState.CONNECTED:
                     print("WebSocket disconnected, breaking loop")
@@ -267,24 +350,17 @@ async def websocket_endpoint(websocket: WebSocket):
                         break
                     audio_buffer.extend(data)
                 except asyncio.TimeoutError:
-                    if transcriber and len(audio_buffer) >= MIN_FLUSH_BYTES:
-                        try:
-                            transcriber.stream(bytes(audio_buffer))
-                        except Exception as e:
-                            print(
-                                f"Error streaming audio chunk on idle flush: {e}")
+                    if egress and len(audio_buffer) >= MIN_FLUSH_BYTES:
+                        send_frame(bytes(audio_buffer))
                         audio_buffer.clear()
                     continue
 
                 # Send full TARGET_BYTES frames
                 while len(audio_buffer) >= TARGET_BYTES:
-                    chunk = audio_buffer[:TARGET_BYTES]
+                    chunk = bytes(audio_buffer[:TARGET_BYTES])
                     del audio_buffer[:TARGET_BYTES]
-                    if transcriber:
-                        try:
-                            transcriber.stream(bytes(chunk))
-                        except Exception as e:
-                            print(f"Error streaming audio chunk: {e}")
+                    if egress:
+                        send_frame(chunk)
 
         except WebSocketDisconnect:
             print("WebSocket disconnected by client")
@@ -301,14 +377,15 @@ async def websocket_endpoint(websocket: WebSocket):
 
         # Flush trailing audio safely
         try:
-            if "audio_buffer" in locals() and transcriber and len(audio_buffer) >= (16000*2)//1000 * 50:
-                try:
-                    await asyncio.to_thread(transcriber.stream, bytes(audio_buffer))
-                except Exception:
-                    pass
+            if "audio_buffer" in locals() and egress and len(audio_buffer) >= (16000*2)//1000 * 50:
+                egress.submit(bytes(audio_buffer))
         except Exception:
             pass
 
+        if egress:
+            # drain what is queued before the transcriber goes away
+            await asyncio.to_thread(egress.close)
+
         if transcriber:
             try:
                 # ✅ non-blocking
@@ -317,9 +394,25 @@ async def websocket_endpoint(websocket: WebSocket):
             except Exception as e:
                 print(f"Error disconnecting transcriber: {e}")
 
+        if speculator:
+            speculator.close()
+        if captions:
+            captions.close()
+        if timing_tracker and user_id:
+            await save_turn_timing(user_id, timing_tracker)
+        turns = session_memory.get(session_id, {}).get("turns") if session_id else None
+        if turns:
+            await turns.close()
+        if session_id and session_id in session_memory:
+            await close_session_memory(session_memory[session_id])
+
+        if session_id:
+            await get_registry().unregister(session_id)
         if session_id and session_id in session_memory:
             del session_memory[session_id]
             print(f"Session memory cleared for: {session_id}")
+        if session_id:
+            AgentStateRegistry.cleanup_session(session_id)
 
         try:
             if websocket.client_state == WebSocketState.CONNECTED:
@@ -331,9 +424,51 @@ async def websocket_endpoint(websocket: WebSocket):
         print(f"Session cleanup completed for: {session_id}")
 
 
+async def sweep_sessions() -> None:
+    """Background loop: hibernate idle sessions."""
+    while True:
+        await asyncio.sleep(settings.JARVIS_SESSION_SWEEP_SECONDS)
+        try:
+            for sid in idle_sessions(session_memory):
+                hibernate(session_memory[sid])
+        except Exception as e:
+            print(f"Error sweeping sessions: {e}")
+
+
+def deliver_trigger(user_id: int, text: str) -> int:
+    """
+    Queue a scheduler trigger on this worker's most recently active session
+    of the user (runs on the event loop). One session only: a user with two
+    tabs or devices open must not get the scheduled action run twice.
+    """
+    sessions = [data for data in list(session_memory.values())
+                if data.get("user_id") == user_id and data.get("turns")]
+    if not sessions:
+        return 0
+    latest = max(sessions, key=lambda data: data.get("last_active", 0.0))
+    # queued behind the user's own turns, never run concurrently with them
+    latest["turns"].submit_scheduled(text)
+    return 1
+
+
 # Health check function for debugging
 def get_active_sessions():
+    memory = {sid: account(data) for sid, data in list(session_memory.items())}
     return {
         "active_sessions": len(session_memory),
         "session_ids": list(session_memory.keys()),
+        "audio_egress": {
+            sid: data["audio_egress"].stats()
+            for sid, data in list(session_memory.items()) if data.get("audio_egress")
+        },
+        "vad": {
+            sid: data["vad"].stats()
+            for sid, data in list(session_memory.items()) if data.get("vad")
+        },
+        "captions": {
+            sid: data["captions"].stats()
+            for sid, data in list(session_memory.items()) if data.get("captions")
+        },
+        "memory": memory,
+        "memory_total_bytes": sum(m["bytes"] for m in memory.values()),
     }
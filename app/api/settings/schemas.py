@@ -1,10 +1,16 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
 
 class SettingsUpdate(BaseModel):
     name: Optional[str] = None
     timezone: Optional[str] = None
     utc_offset: Optional[str] = None
+    # end-of-turn tuning; setting any of these pins them (turn_timing_override),
+    # sending turn_timing_override=false hands them back to the learner
+    eot_confidence_threshold: Optional[float] = Field(None, ge=0.5, le=0.9)
+    eot_min_silence_ms: Optional[int] = Field(None, ge=200, le=1200)
+    eot_max_silence_ms: Optional[int] = Field(None, ge=1000, le=4000)
+    turn_timing_override: Optional[bool] = None
 
 class Settings(BaseModel):
     id: int
@@ -13,6 +19,10 @@ class Settings(BaseModel):
     auth_provider: Optional[str] = None
     timezone: Optional[str] = None
     utc_offset: Optional[str] = None
+    eot_confidence_threshold: Optional[float] = None
+    eot_min_silence_ms: Optional[int] = None
+    eot_max_silence_ms: Optional[int] = None
+    turn_timing_override: Optional[bool] = None
 
     class Config:
         orm_mode = True
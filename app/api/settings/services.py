@@ -2,10 +2,16 @@ from sqlalchemy.orm import Session
 from app.db.models.user import User
 from . import schemas
 
+TURN_TIMING_FIELDS = ("eot_confidence_threshold", "eot_min_silence_ms", "eot_max_silence_ms")
+
 def update_user_settings(db: Session, user_id: int, settings: schemas.SettingsUpdate) -> User:
     db_user = db.query(User).filter(User.id == user_id).first()
     if db_user:
         update_data = settings.dict(exclude_unset=True)
+        if "turn_timing_override" not in update_data and any(
+                update_data.get(key) is not None for key in TURN_TIMING_FIELDS):
+            # hand-set values must not be tuned away by the learner
+            update_data["turn_timing_override"] = True
         for key, value in update_data.items():
             setattr(db_user, key, value)
         db.commit()
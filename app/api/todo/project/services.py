@@ -1,5 +1,8 @@
+from typing import Optional
+
 from sqlalchemy.orm import Session
 from app.db.models.todo.project import Project
+from app.db.session import run_db
 from . import schemas
 
 def create_project(db: Session, project: schemas.ProjectCreate, user_id: int):
@@ -12,6 +15,18 @@ def create_project(db: Session, project: schemas.ProjectCreate, user_id: int):
 def get_projects(db: Session, user_id: int):
     return db.query(Project).filter(Project.user_id == user_id).all()
 
+def search_projects(db: Session, user_id: int, name: Optional[str] = None, limit: int = 50):
+    """Projected project lookup (id, name, inbox/favorite flags); returns (rows, total)."""
+    query = db.query(Project.id, Project.name, Project.is_inbox_project, Project.is_favorite).filter(
+        Project.user_id == user_id
+    )
+    if name:
+        query = query.filter(Project.name.ilike(f"%{name.strip()}%"))
+    rows = query.order_by(Project.is_inbox_project.desc(), Project.order, Project.id).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, len(rows)
+    return rows[:limit], query.order_by(None).count()
+
 def get_project(db: Session, project_id: int, user_id: int):
     return db.query(Project).filter(Project.id == project_id, Project.user_id == user_id).first()
 
@@ -30,3 +45,18 @@ def delete_project(db: Session, project_id: int, user_id: int):
         db.delete(db_project)
         db.commit()
     return db_project
+
+
+# Async variants used by the agent (DB thread pool, plain dicts)
+async def create_project_async(project: schemas.ProjectCreate, user_id: int) -> dict:
+    return await run_db(lambda db: create_project(db, project, user_id).to_dict())
+
+async def search_projects_async(user_id: int, name: Optional[str] = None, limit: int = 50) -> dict:
+    def _search(db: Session):
+        rows, total = search_projects(db, user_id, name=name, limit=limit)
+        return {
+            "projects": [dict(row._mapping) for row in rows],
+            "total": total,
+            "truncated": total > len(rows),
+        }
+    return await run_db(_search)
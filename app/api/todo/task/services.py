@@ -1,5 +1,9 @@
+from typing import Optional
+
+from sqlalchemy import or_, nullslast
 from sqlalchemy.orm import Session
 from app.db.models.todo.task import Task
+from app.db.session import run_db
 from . import schemas
 
 from datetime import date
@@ -34,6 +38,45 @@ def get_pending_tasks(db: Session, user_id: int):
     ).all()
 
 
+# Minimal task shape returned to the agent
+TASK_SUMMARY_COLUMNS = (Task.id, Task.content, Task.due_date, Task.priority, Task.project_id, Task.is_completed)
+
+
+def search_tasks(db: Session, user_id: int, status: str = "all", project_id: Optional[int] = None,
+                 due_after: Optional[str] = None, due_before: Optional[str] = None,
+                 priority: Optional[int] = None, text: Optional[str] = None, limit: int = 20):
+    """
+    Filtered, projected task lookup. Returns (rows, total); total is only
+    counted when more than `limit` rows match.
+    Dates are compared as the ISO strings they are stored as; a date-only
+    due_before includes that whole day.
+    """
+    query = db.query(*TASK_SUMMARY_COLUMNS).filter(
+        Task.creator_id == user_id,
+        Task.is_deleted == False
+    )
+    if status == "pending":
+        query = query.filter(Task.is_completed == False)
+    elif status == "completed":
+        query = query.filter(Task.is_completed == True)
+    if project_id is not None:
+        query = query.filter(Task.project_id == project_id)
+    if priority is not None:
+        query = query.filter(Task.priority == priority)
+    if due_after:
+        query = query.filter(Task.due_date >= due_after)
+    if due_before:
+        query = query.filter(Task.due_date <= (due_before + "T23:59:59" if len(due_before) == 10 else due_before))
+    if text:
+        pattern = f"%{text.strip()}%"
+        query = query.filter(or_(Task.content.ilike(pattern), Task.description.ilike(pattern)))
+
+    rows = query.order_by(nullslast(Task.due_date.asc()), Task.id).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, len(rows)
+    return rows[:limit], query.order_by(None).count()
+
+
 def create_task(db: Session, task: schemas.TaskCreate, user_id: int):
     db_task = Task(**task.model_dump(), creator_id=user_id)
     db.add(db_task)
@@ -62,3 +105,25 @@ def delete_task(db: Session, task_id: int, user_id: int):
         db.delete(db_task)
         db.commit()
     return db_task
+
+
+# Async variants used by the agent: they run in the DB thread pool and
+# return plain dicts so nothing touches a closed session afterwards.
+async def create_task_async(task: schemas.TaskCreate, user_id: int) -> dict:
+    return await run_db(lambda db: create_task(db, task, user_id).to_dict())
+
+async def update_task_async(task_id: int, task: schemas.TaskUpdate, user_id: int) -> dict | None:
+    def _update(db: Session):
+        db_task = update_task(db, task_id, task, user_id)
+        return db_task.to_dict() if db_task else None
+    return await run_db(_update)
+
+async def search_tasks_async(user_id: int, limit: int = 20, **filters) -> dict:
+    def _search(db: Session):
+        rows, total = search_tasks(db, user_id, limit=limit, **filters)
+        return {
+            "tasks": [dict(row._mapping) for row in rows],
+            "total": total,
+            "truncated": total > len(rows),
+        }
+    return await run_db(_search)
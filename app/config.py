@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 
@@ -9,6 +11,7 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     ENV: str = "local"  # Environment setting
+    DB_THREAD_POOL_SIZE: int = 10  # threads for ORM calls made from async code
 
     # Outlook OAuth settings
     OUTLOOK_CLIENT_ID: str
@@ -18,6 +21,54 @@ class Settings(BaseSettings):
     # Open-AI Key
     OPENAI_API_KEY: str
     ASSEMBLYAI_API_KEY: str
+    TAVILY_API_KEY: Optional[str] = None  # web search (search_google) is off without it
+
+    # Jarvis agent tuning
+    JARVIS_TOOL_CONCURRENCY: int = 4  # tool calls from one model turn run in parallel
+    JARVIS_TOOL_TIMEOUT_SECONDS: float = 20.0  # default per-tool timeout
+    JARVIS_FAST_PATH_ENABLED: bool = True  # answer trivial commands without the LLM
+    JARVIS_AUDIO_QUEUE_SLOTS: int = 50  # per-session ASR send queue (~5 s of 100 ms frames)
+    JARVIS_VAD_ENABLED: bool = True  # hold back silent audio instead of sending it to the ASR
+    JARVIS_HISTORY_TOKEN_BUDGET: int = 1500  # conversation tokens re-sent each turn; older turns are summarized
+    JARVIS_TOOL_DIGEST_CHARS: int = 600  # tool results from earlier turns are cut down to this
+    JARVIS_TOOL_DIGEST_KEEP_TURNS: int = 2  # newest turns keep their full tool results
+    JARVIS_SUMMARY_MODEL: str = "gpt-4o-mini"
+    JARVIS_INTERIM_AFTER_SECONDS: float = 1.2  # speak "let me check..." when tools run longer than this
+    JARVIS_SPECULATION_ENABLED: bool = False  # start the agent on a stable partial, commit it on a matching final
+    JARVIS_SPECULATION_STABLE_MS: int = 300
+    JARVIS_SPECULATION_MIN_CHARS: int = 12
+    JARVIS_TURN_TIMING_ADAPTIVE: bool = True  # learn per-user end-of-turn parameters from cut-offs
+    JARVIS_TURN_TIMING_MIN_TURNS: int = 4  # sessions with fewer turns are not learned from
+    JARVIS_EOT_CUTOFF_WINDOW_MS: int = 1200  # speech this soon after a final = the user was cut off
+    JARVIS_CAPTION_MAX_HZ: float = 8.0  # asr_partial captions per second per session (0 = unthrottled)
+    JARVIS_SESSION_REGISTRY_REDIS_URL: Optional[str] = None  # shared session registry across workers; in-process if unset
+    JARVIS_SESSION_TTL_SECONDS: int = 90  # registry entries of a dead worker expire after this
+    JARVIS_SESSION_MAX_BYTES: int = 262144  # data budget per session; the oldest conversation turns give way
+    JARVIS_SESSION_IDLE_SECONDS: int = 900  # no turn for this long: the session sheds rebuildable state
+    JARVIS_SESSION_SWEEP_SECONDS: int = 60
+    JARVIS_TRACE_RING_SIZE: int = 200  # finished turn traces kept in memory (/agent/jarvis/traces)
+    JARVIS_TRACE_EXPORT: Optional[str] = None  # "log" or "jsonl:<path>"; unset keeps traces in memory only
+    # Model cascade: tiers are light / default / strong; routes pick a tier (or "template")
+    JARVIS_MODEL_CASCADE_ENABLED: bool = True
+    JARVIS_MODEL_DEFAULT: str = "gpt-4o-mini"
+    JARVIS_MODEL_LIGHT: str = "gpt-4.1-nano"
+    JARVIS_MODEL_STRONG: str = "gpt-4o"
+    JARVIS_MODEL_TEMPERATURE: float = 0.8
+    JARVIS_MODEL_ROUTE_POST_TOOL: str = "light"  # verbalizing the result of a single-intent turn's last tool
+    JARVIS_MODEL_ROUTE_SMALLTALK: str = "light"  # greetings and thanks
+    JARVIS_MODEL_ROUTE_PLANNING: str = "strong"  # multi-step requests, or too many tool rounds
+    JARVIS_POST_TOOL_TEMPLATES: bool = True  # confirm simple writes without an LLM call
+    JARVIS_MODEL_STRONG_MIN_WORDS: int = 30
+    JARVIS_MODEL_ESCALATE_AFTER_CALLS: int = 3
+    # User memory: one row per fact, lexical top-k retrieval (app.agent.user_memory)
+    JARVIS_MEMORY_MAX_FACTS: int = 200  # per user; least recently updated facts are evicted
+    JARVIS_MEMORY_DEDUPE_SIMILARITY: float = 0.95  # a new fact replaces an old one only this close and with the same numbers/names
+    JARVIS_MEMORY_CONTEXT_TOP_K: int = 5
+    JARVIS_MEMORY_TOOL_TOP_K: int = 8
+    JARVIS_TOOL_CACHE_ENABLED: bool = True  # TTL cache for weather / web search results
+    JARVIS_TOOL_CACHE_MAX_ENTRIES: int = 2048
+    JARVIS_TOOL_CACHE_REDIS_URL: Optional[str] = None  # e.g. redis://localhost:6379/1 to share across workers
+
     class Config:
         env_file = ".env"
 
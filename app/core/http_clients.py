@@ -0,0 +1,70 @@
+import importlib.util
+from typing import Dict, Optional
+
+import httpx
+from openai import AsyncOpenAI
+
+from app.config import settings
+
+# One keep-alive pool per upstream, so a slow host cannot use up the
+# connections of the others: name -> (max connections, request timeout seconds)
+HOST_LIMITS = {
+    "open-meteo": (20, 10.0),
+    "tavily": (10, 20.0),
+    "default": (20, 15.0),
+}
+KEEPALIVE_EXPIRY_SECONDS = 60.0
+
+_clients: Dict[str, httpx.AsyncClient] = {}
+_openai_client: Optional[AsyncOpenAI] = None
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def _create_client(name: str) -> httpx.AsyncClient:
+    max_connections, timeout = HOST_LIMITS.get(name, HOST_LIMITS["default"])
+    return httpx.AsyncClient(
+        http2=http2_available(),
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        timeout=httpx.Timeout(timeout, connect=5.0),
+    )
+
+
+def http_client(name: str = "default") -> httpx.AsyncClient:
+    """Shared pooled client for an upstream (created on first use outside the app lifespan)."""
+    client = _clients.get(name)
+    if client is None or client.is_closed:
+        client = _create_client(name)
+        _clients[name] = client
+    return client
+
+
+def openai_client() -> AsyncOpenAI:
+    """Shared AsyncOpenAI client (it keeps its own connection pool)."""
+    global _openai_client
+    if _openai_client is None:
+        _openai_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, max_retries=1)
+    return _openai_client
+
+
+async def start_http_clients() -> None:
+    for name in HOST_LIMITS:
+        http_client(name)
+    openai_client()
+    print(f"HTTP pools ready: {', '.join(HOST_LIMITS)} (http2={http2_available()})")
+
+
+async def close_http_clients() -> None:
+    global _openai_client
+    for client in list(_clients.values()):
+        await client.aclose()
+    _clients.clear()
+    if _openai_client is not None:
+        await _openai_client.close()
+        _openai_client = None
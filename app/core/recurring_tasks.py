@@ -5,8 +5,26 @@ from zoneinfo import ZoneInfo
 from sqlalchemy.orm import Session
 from app.db.session import SessionLocal
 from app.db.models.scheduled_task import ScheduledTask
-from app.agent.websocket_handler import session_memory
-from app.agent.transcript_processor import process_transcript_streaming 
+from app.core.session_registry import get_registry, run_on_registry_loop
+
+# every worker's scheduler fires each minute; the lock lets one of them do the check
+SCHEDULER_LOCK_SECONDS = 55
+
+def add_scheduled_task(user_id: int, task_description: str, schedule_time: str,
+                       frequency: str, timezone: str, db: Session) -> int:
+    """Store an active recurring task (run through run_db); returns its id."""
+    task = ScheduledTask(
+        user_id=user_id,
+        task_description=task_description,
+        schedule_time=schedule_time,
+        frequency=frequency,
+        timezone=timezone,
+        is_active=True
+    )
+    db.add(task)
+    db.commit()
+    return task.id
+
 
 def check_and_run_scheduled_tasks_sync():
     """
@@ -15,30 +33,20 @@ def check_and_run_scheduled_tasks_sync():
     This function is designed to be run by a Scheduler (e.g. APScheduler).
     """
     
-    # Session memory structure: 
-    # {session_id: {"user_id": 1, "websocket": ws, "timezone": "UTC", "loop": loop, ...}}
-    
-    # 1. Gather active users
-    active_sessions = {}
-    active_user_ids = []
-    
-    if not session_memory:
+    # 1. Gather active users from the session registry (all workers):
+    # {user_id: {"session_id": ..., "worker": ..., "timezone": "UTC", ...}}
+    registry = get_registry()
+    try:
+        if not run_on_registry_loop(registry.acquire_scheduler_lock(SCHEDULER_LOCK_SECONDS)):
+            return
+        active_sessions = run_on_registry_loop(registry.connected_users())
+    except Exception as e:
+        print(f"Error reading session registry: {e}")
         return
 
-    for session_id, session_data in session_memory.items():
-        if session_data.get("websocket") and session_data.get("user_id"):
-            uid = session_data["user_id"]
-            active_user_ids.append(uid)
-            # Store session info for quick lookup by user_id
-            active_sessions[uid] = {
-                "session_id": session_id,
-                "websocket": session_data["websocket"],
-                "loop": session_data.get("loop"), 
-                "data": session_data
-            }
-
     if not active_sessions:
         return
+    active_user_ids = list(active_sessions)
 
     # 2. Check DB for tasks for these users
     db: Session = SessionLocal()
@@ -60,7 +68,7 @@ def check_and_run_scheduled_tasks_sync():
                 continue
 
             # Determine User's Timezone
-            user_tz_str = user_session["data"].get("timezone") or task.timezone or "UTC"
+            user_tz_str = user_session.get("timezone") or task.timezone or "UTC"
             try:
                 user_tz = ZoneInfo(user_tz_str)
             except:
@@ -110,26 +118,12 @@ def check_and_run_scheduled_tasks_sync():
                 task.last_run_at = current_utc
                 db.commit()
 
-                # Trigger Agent
-                loop = user_session.get("loop")
-                ws = user_session.get("websocket")
-                sess_id = user_session.get("session_id")
-                
                 # Construct trigger message
                 trigger_text = f"Perform scheduled task: {task.task_description}"
-                
-                if loop and not loop.is_closed():
-                    asyncio.run_coroutine_threadsafe(
-                        process_transcript_streaming(
-                            ws,
-                            sess_id,
-                            trigger_text,
-                            session_memory
-                        ),
-                        loop
-                    )
-                else:
-                    print(f"Loop invalid for user {task.user_id}")
+
+                # Trigger Agent on the worker that owns the user's session
+                if not run_on_registry_loop(registry.send_trigger(task.user_id, trigger_text)):
+                    print(f"No worker took the scheduled task for user {task.user_id}")
 
     except Exception as e:
         print(f"Error in check_scheduled_tasks: {e}")
@@ -26,7 +26,8 @@ from fastapi import Depends, HTTPException, status
 from jose import JWTError, jwt
 import logging
 
-async def get_current_user_for_ws(token: str, db: Session) -> User:
+def get_user_for_ws_token(token: str, db: Session) -> User:
+    """Blocking token -> User lookup; async callers should run it via run_db."""
     try:
         print(token)
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
@@ -63,6 +64,10 @@ async def get_current_user_for_ws(token: str, db: Session) -> User:
     return user
 
 
+async def get_current_user_for_ws(token: str, db: Session) -> User:
+    return get_user_for_ws_token(token=token, db=db)
+
+
 
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
     credentials_exception = HTTPException(
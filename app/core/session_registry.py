@@ -0,0 +1,251 @@
+import asyncio
+import json
+import os
+import socket
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.config import settings
+
+KEY_PREFIX = "jarvis:"
+SESSIONS_KEY = f"{KEY_PREFIX}sessions"  # zset: session id -> expiry timestamp
+SCHEDULER_LOCK_KEY = f"{KEY_PREFIX}scheduler-lock"
+
+# (user_id, text) -> number of local sessions the trigger was queued on
+TriggerHandler = Callable[[int, str], int]
+
+# identifies this process in routing entries and names its trigger channel
+WORKER_ID = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+def _session_key(session_id: str) -> str:
+    return f"{KEY_PREFIX}session:{session_id}"
+
+
+def _user_key(user_id: int) -> str:
+    return f"{KEY_PREFIX}user-worker:{user_id}"
+
+
+def _worker_channel(worker_id: str) -> str:
+    return f"{KEY_PREFIX}worker:{worker_id}"
+
+
+class InProcessSessionRegistry:
+    """Single-worker registry (development): every session and trigger is local."""
+
+    def __init__(self):
+        self._sessions: Dict[str, Dict[str, Any]] = {}
+        self._deliver: Optional[TriggerHandler] = None
+
+    async def start(self, deliver: TriggerHandler) -> None:
+        self._deliver = deliver
+
+    async def register(self, session_id: str, user_id: int, **meta: Any) -> None:
+        self._sessions[session_id] = {"user_id": user_id, "worker": WORKER_ID, **meta}
+
+    async def unregister(self, session_id: str) -> None:
+        self._sessions.pop(session_id, None)
+
+    async def connected_users(self) -> Dict[int, Dict[str, Any]]:
+        """user_id -> metadata of one of their live sessions."""
+        return {meta["user_id"]: {**meta, "session_id": sid} for sid, meta in self._sessions.items()}
+
+    async def send_trigger(self, user_id: int, text: str) -> bool:
+        return bool(self._deliver and self._deliver(user_id, text))
+
+    async def acquire_scheduler_lock(self, ttl: int) -> bool:
+        return True
+
+    async def close(self) -> None:
+        self._sessions.clear()
+
+    def stats(self) -> dict:
+        return {"backend": type(self).__name__, "worker": WORKER_ID, "local_sessions": len(self._sessions)}
+
+
+class RedisSessionRegistry:
+    """
+    Registry shared by every worker and node.
+
+    Each session is a hash (user, owning worker, timezone, ...) that expires
+    unless its worker keeps refreshing it, indexed by a zset scored by expiry
+    so a crashed worker's sessions age out. Triggers for a user are
+    published on the owning worker's channel; the worker's subscriber hands
+    them to the local turn scheduler, since the websocket and event loop
+    never leave that worker.
+    """
+
+    def __init__(self, url: Optional[str] = None, client=None, ttl: int = 90,
+                 worker_id: str = WORKER_ID):
+        if client is None:
+            import redis.asyncio as redis_asyncio
+            client = redis_asyncio.from_url(url, decode_responses=True,
+                                            socket_timeout=2, socket_connect_timeout=2)
+        self._redis = client
+        self.worker_id = worker_id
+        self.ttl = ttl
+        self._local: Dict[str, Dict[str, Any]] = {}
+        self._deliver: Optional[TriggerHandler] = None
+        self._tasks = []
+        self.triggers_sent = 0
+        self.triggers_received = 0
+
+    async def start(self, deliver: TriggerHandler) -> None:
+        self._deliver = deliver
+        self._tasks = [
+            asyncio.create_task(self._listen()),
+            asyncio.create_task(self._heartbeat()),
+        ]
+
+    async def register(self, session_id: str, user_id: int, **meta: Any) -> None:
+        entry = {"user_id": user_id, "worker": self.worker_id, "started_at": time.time(), **meta}
+        self._local[session_id] = entry
+        await self._write(session_id, entry)
+
+    async def _write(self, session_id: str, entry: Dict[str, Any]) -> None:
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.hset(_session_key(session_id), mapping={k: json.dumps(v) for k, v in entry.items()})
+            pipe.expire(_session_key(session_id), self.ttl)
+            pipe.zadd(SESSIONS_KEY, {session_id: time.time() + self.ttl})
+            # routing: triggers for this user go to the worker that last registered them
+            pipe.set(_user_key(entry["user_id"]), self.worker_id, ex=self.ttl)
+            await pipe.execute()
+
+    async def unregister(self, session_id: str) -> None:
+        entry = self._local.pop(session_id, None)
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                pipe.delete(_session_key(session_id))
+                pipe.zrem(SESSIONS_KEY, session_id)
+                await pipe.execute()
+            if entry and not any(e["user_id"] == entry["user_id"] for e in self._local.values()):
+                # only drop the route if it still points here
+                if await self._redis.get(_user_key(entry["user_id"])) == self.worker_id:
+                    await self._redis.delete(_user_key(entry["user_id"]))
+        except Exception as e:
+            # the entry expires on its own
+            print(f"Session registry unregister failed: {e}")
+
+    async def connected_users(self) -> Dict[int, Dict[str, Any]]:
+        await self._redis.zremrangebyscore(SESSIONS_KEY, "-inf", time.time())
+        session_ids = await self._redis.zrange(SESSIONS_KEY, 0, -1)
+        if not session_ids:
+            return {}
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for session_id in session_ids:
+                pipe.hgetall(_session_key(session_id))
+            rows = await pipe.execute()
+
+        users: Dict[int, Dict[str, Any]] = {}
+        for session_id, row in zip(session_ids, rows):
+            if not row:
+                continue
+            meta = {k: json.loads(v) for k, v in row.items()}
+            users[meta["user_id"]] = {**meta, "session_id": session_id}
+        return users
+
+    async def send_trigger(self, user_id: int, text: str) -> bool:
+        worker = await self._redis.get(_user_key(user_id))
+        if worker is None:
+            return False
+        payload = json.dumps({"user_id": user_id, "text": text})
+        receivers = await self._redis.publish(_worker_channel(worker), payload)
+        self.triggers_sent += 1
+        return receivers > 0
+
+    async def acquire_scheduler_lock(self, ttl: int) -> bool:
+        """One worker per interval runs the scheduler check."""
+        return bool(await self._redis.set(SCHEDULER_LOCK_KEY, self.worker_id, nx=True, ex=ttl))
+
+    async def _listen(self) -> None:
+        backoff = 1.0
+        while True:
+            pubsub = self._redis.pubsub()
+            try:
+                await pubsub.subscribe(_worker_channel(self.worker_id))
+                backoff = 1.0
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    trigger = json.loads(message["data"])
+                    self.triggers_received += 1
+                    if self._deliver:
+                        self._deliver(trigger["user_id"], trigger["text"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Session registry subscriber error, retrying in {backoff:.0f}s: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.ttl / 3)
+            for session_id, entry in list(self._local.items()):
+                try:
+                    await self._write(session_id, entry)
+                except Exception as e:
+                    print(f"Session registry heartbeat failed: {e}")
+                    break
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        # the subscriber and heartbeat must be gone before the client is closed
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for session_id in list(self._local):
+            await self.unregister(session_id)
+        await self._redis.aclose()
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self).__name__,
+            "worker": self.worker_id,
+            "local_sessions": len(self._local),
+            "triggers_sent": self.triggers_sent,
+            "triggers_received": self.triggers_received,
+        }
+
+
+_registry = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_registry():
+    global _registry
+    if _registry is None:
+        if settings.JARVIS_SESSION_REGISTRY_REDIS_URL:
+            _registry = RedisSessionRegistry(settings.JARVIS_SESSION_REGISTRY_REDIS_URL,
+                                             ttl=settings.JARVIS_SESSION_TTL_SECONDS)
+        else:
+            _registry = InProcessSessionRegistry()
+    return _registry
+
+
+async def start_session_registry(deliver: TriggerHandler) -> None:
+    global _loop
+    _loop = asyncio.get_running_loop()
+    registry = get_registry()
+    await registry.start(deliver)
+    print(f"Session registry ready: {registry.stats()}")
+
+
+async def close_session_registry() -> None:
+    global _registry
+    if _registry is not None:
+        await _registry.close()
+        _registry = None
+
+
+def run_on_registry_loop(coro: Awaitable[Any], timeout: float = 10.0) -> Any:
+    """Run a registry call from a non-async thread (the background scheduler)."""
+    if _loop is None or _loop.is_closed():
+        raise RuntimeError("session registry is not running")
+    return asyncio.run_coroutine_threadsafe(coro, _loop).result(timeout)
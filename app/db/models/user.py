@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Boolean, Column, Float, Integer, JSON, String
 from sqlalchemy.orm import relationship
 from app.db.session import Base
 
@@ -13,6 +13,13 @@ class User(Base):
     provider_user_id = Column(String, nullable=True)
     timezone = Column(String, nullable=True)  # User's timezone
     utc_offset = Column(String, nullable=True)
+
+    # AssemblyAI end-of-turn tuning; learned per user unless overridden (null = default)
+    eot_confidence_threshold = Column(Float, nullable=True)
+    eot_min_silence_ms = Column(Integer, nullable=True)
+    eot_max_silence_ms = Column(Integer, nullable=True)
+    turn_timing_override = Column(Boolean, nullable=False, default=False, server_default="false")
+    turn_timing_stats = Column(JSON, nullable=True)
     
     # One-to-one relationship with OutlookCredentials
     outlook_credentials = relationship("OutlookCredentials", back_populates="user", uselist=False)
@@ -1,10 +1,16 @@
-from sqlalchemy import Column, ForeignKey, Integer, String
-from sqlalchemy.orm import relationship
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, Text
 from app.db.session import Base
 
 
 class UserInfo(Base):
+    """One remembered fact about a user (see app.agent.user_memory)."""
     __tablename__ = "user_info"
-    user_id = Column(Integer,
-                     index=True, primary_key=True)
-    info = Column(String)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
+    info = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    # bumped when the fact is restated; eviction drops the least recently updated
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
@@ -1,3 +1,5 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.config import settings
@@ -30,4 +32,23 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# Blocking ORM work issued from async code (agent tools, websocket auth) runs
+# on this bounded pool instead of the event loop.
+db_executor = ThreadPoolExecutor(
+    max_workers=settings.DB_THREAD_POOL_SIZE, thread_name_prefix="db")
+
+
+async def run_db(fn, *args, **kwargs):
+    """
+    Run fn(*args, db=<Session>, **kwargs) in the DB thread pool with a fresh session.
+    Return plain data from fn: ORM objects are detached once the session closes.
+    """
+    def _call():
+        with get_db_context() as db:
+            return fn(*args, db=db, **kwargs)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(db_executor, _call)
@@ -14,8 +14,15 @@ from app.api.todo.comment.routes import router as comment_router
 from app.api.settings.routes import router as settings_router
 
 # Scheduler for Sync
+import asyncio
 from contextlib import asynccontextmanager
 from app.core.scheduler import start_scheduler
+from app.agent.conversation_memory import load_tokenizer
+from app.agent.tracing import configure_exporters
+from app.core.http_clients import start_http_clients, close_http_clients
+from app.agent.tool_cache import close_tool_cache
+from app.core.session_registry import start_session_registry, close_session_registry
+from app.agent.websocket_handler import deliver_trigger, sweep_sessions
 
 import requests
 
@@ -26,8 +33,29 @@ from app.db.models.user_info import UserInfo
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # sessions of every worker, and the channel scheduler triggers reach this one on
+    await start_session_registry(deliver_trigger)
     start_scheduler()
+    configure_exporters()
+    # may download the encoding on first run; counts are estimated until it is ready
+    tokenizer = asyncio.create_task(asyncio.to_thread(load_tokenizer))
+    # keep-alive pools shared by all agent tools
+    await start_http_clients()
+    # idle sessions shed their state
+    sweeper = asyncio.create_task(sweep_sessions())
     yield
+    sweeper.cancel()
+    tokenizer.cancel()
+    for task in (sweeper, tokenizer):
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            print(f"Background task failed: {e}")
+    await close_http_clients()
+    await close_tool_cache()
+    await close_session_registry()
 
 app = FastAPI(lifespan=lifespan)
 
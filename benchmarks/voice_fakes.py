@@ -0,0 +1,248 @@
+"""
+Offline stand-ins for the external services the Jarvis voice pipeline talks to:
+
+- FakeStreamingClient replaces assemblyai's StreamingClient: it listens to the
+  audio the server forwards, tracks speech/silence by energy and emits partial
+  and final TurnEvents for the next scripted utterance.
+- StubChatModel replaces the bound ChatOpenAI model with configurable latency
+  and scripted tool calls.
+- pcm helpers generate synthetic speech-like audio or load WAV/PCM fixtures.
+"""
+import asyncio
+import json
+import math
+import struct
+import threading
+import time
+import uuid
+import wave
+from array import array
+from typing import Any, Dict, Iterator, List, Optional
+
+from assemblyai.streaming.v3 import StreamingEvents, TurnEvent
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+SAMPLE_RATE = 16000
+BYTES_PER_MS = SAMPLE_RATE * 2 // 1000
+
+
+# ---------------------------
+# Audio fixtures
+# ---------------------------
+
+def synth_speech(ms: int, seed: int = 0) -> bytes:
+    """Voiced, amplitude-modulated tone: loud enough to pass the VAD like speech."""
+    samples = array("h")
+    pitch = 140 + (seed % 7) * 15
+    for i in range(ms * SAMPLE_RATE // 1000):
+        t = i / SAMPLE_RATE
+        envelope = 0.6 + 0.4 * math.sin(2 * math.pi * 4 * t)
+        samples.append(int(6000 * envelope * math.sin(2 * math.pi * pitch * t)))
+    return samples.tobytes()
+
+
+def synth_silence(ms: int) -> bytes:
+    """Low-level noise rather than digital zeros, like a real microphone."""
+    samples = array("h", ((i * 7919) % 61 - 30 for i in range(ms * SAMPLE_RATE // 1000)))
+    return samples.tobytes()
+
+
+def load_pcm(path: str) -> bytes:
+    """16 kHz mono PCM16 from a .wav file or a raw .pcm/.raw file."""
+    if path.lower().endswith(".wav"):
+        with wave.open(path, "rb") as wav:
+            if wav.getframerate() != SAMPLE_RATE or wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+                raise ValueError(f"{path}: expected 16 kHz mono 16-bit PCM")
+            return wav.readframes(wav.getnframes())
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def packets(pcm: bytes, packet_ms: int = 100) -> Iterator[bytes]:
+    size = packet_ms * BYTES_PER_MS
+    for offset in range(0, len(pcm), size):
+        yield pcm[offset:offset + size]
+
+
+def _peak(chunk: bytes) -> int:
+    usable = len(chunk) - len(chunk) % 2
+    if not usable:
+        return 0
+    values = struct.unpack(f"<{usable // 2}h", chunk[:usable])
+    return max(abs(min(values)), max(values))
+
+
+# ---------------------------
+# AssemblyAI replacement
+# ---------------------------
+
+class FakeStreamingClient:
+    """
+    Drop-in for assemblyai.streaming.v3.StreamingClient.
+
+    Utterances are taken round-robin from `FakeStreamingClient.utterances`.
+    While speech is heard a partial is emitted every `partial_every_ms`; after
+    `end_of_turn_silence_ms` of silence following speech a final
+    (end_of_turn=True) TurnEvent is emitted. Handlers run on the thread that
+    calls stream(), like the SDK's reader thread.
+    """
+
+    utterances: List[str] = ["what time is it"]
+    partial_every_ms = 300
+    end_of_turn_silence_ms = 500
+    speech_peak = 2000
+
+    instances = 0
+    finals_emitted = 0
+    _lock = threading.Lock()
+
+    def __init__(self, options: Any = None):
+        self._handlers: Dict[Any, list] = {}
+        with FakeStreamingClient._lock:
+            FakeStreamingClient.instances += 1
+            self._index = FakeStreamingClient.instances
+        self._turn = 0
+        self._speech_ms = 0
+        self._silence_ms = 0
+        self._since_partial = 0
+        self._connected = False
+
+    def on(self, event, handler) -> None:
+        self._handlers.setdefault(event, []).append(handler)
+
+    def connect(self, params: Any = None) -> None:
+        self._connected = True
+
+    def disconnect(self, terminate: bool = False) -> None:
+        self._connected = False
+
+    def _emit(self, end_of_turn: bool) -> None:
+        text = self.utterances[(self._index + self._turn) % len(self.utterances)]
+        if not end_of_turn:
+            # partials grow with the amount of speech heard
+            words = text.split()
+            shown = max(1, min(len(words), self._speech_ms // 250))
+            text = " ".join(words[:shown])
+        event = TurnEvent(
+            type="Turn",
+            turn_order=self._turn,
+            turn_is_formatted=end_of_turn,
+            end_of_turn=end_of_turn,
+            transcript=text,
+            end_of_turn_confidence=0.9 if end_of_turn else 0.1,
+            words=[],
+        )
+        for handler in self._handlers.get(StreamingEvents.Turn, []):
+            handler(self, event)
+
+    def stream(self, data: bytes) -> None:
+        if not self._connected:
+            return
+        ms = len(data) // BYTES_PER_MS
+        if _peak(data) >= self.speech_peak:
+            self._speech_ms += ms
+            self._silence_ms = 0
+            self._since_partial += ms
+            if self._since_partial >= self.partial_every_ms:
+                self._since_partial = 0
+                self._emit(end_of_turn=False)
+            return
+
+        if self._speech_ms == 0:
+            return
+        self._silence_ms += ms
+        if self._silence_ms >= self.end_of_turn_silence_ms:
+            self._emit(end_of_turn=True)
+            with FakeStreamingClient._lock:
+                FakeStreamingClient.finals_emitted += 1
+            self._turn += 1
+            self._speech_ms = 0
+            self._silence_ms = 0
+            self._since_partial = 0
+
+
+# ---------------------------
+# LLM replacement
+# ---------------------------
+
+class StubChatModel(BaseChatModel):
+    """
+    Stands in for ChatOpenAI(...).bind_tools(tools).
+
+    `scripts` maps a phrase contained in the user's utterance to
+    {"tools": [(name, args), ...], "reply": "...", "preamble": "..."}: the
+    first call of a turn returns those tool calls (streaming the optional
+    preamble first), the call after the ToolMessages returns the reply. Unmatched utterances get `default_reply`. Latency is
+    `first_token_ms` plus `token_ms` per streamed word.
+    """
+
+    scripts: Dict[str, Dict[str, Any]] = {}
+    default_reply: str = "Sure. I've taken care of that for you. Anything else on your mind?"
+    first_token_ms: float = 400.0
+    token_ms: float = 15.0
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub-chat"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _script_for(self, messages: List[BaseMessage]):
+        last_human = next((m for m in reversed(messages) if isinstance(m, HumanMessage)), None)
+        if last_human is None:
+            return None, False
+        index = max(i for i, m in enumerate(messages) if m is last_human)
+        tools_done = any(isinstance(m, ToolMessage) for m in messages[index:])
+        text = str(last_human.content).lower()
+        for phrase, script in self.scripts.items():
+            if phrase in text:
+                return script, tools_done
+        return None, tools_done
+
+    def _respond(self, messages: List[BaseMessage]) -> AIMessage:
+        self.calls += 1
+        script, tools_done = self._script_for(messages)
+        if script and script.get("tools") and not tools_done:
+            return AIMessage(content=script.get("preamble", ""), tool_calls=[
+                {"name": name, "args": args, "id": f"call_{uuid.uuid4().hex[:12]}", "type": "tool_call"}
+                for name, args in script["tools"]
+            ])
+        return AIMessage(content=(script or {}).get("reply", self.default_reply))
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        message = self._respond(messages)
+        time.sleep((self.first_token_ms + self.token_ms * len(message.content.split())) / 1000)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        message = self._respond(messages)
+        await asyncio.sleep((self.first_token_ms + self.token_ms * len(message.content.split())) / 1000)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs: Any):
+        message = self._respond(messages)
+        await asyncio.sleep(self.first_token_ms / 1000)
+        if message.tool_calls:
+            for word in filter(None, message.content.split(" ")):
+                await asyncio.sleep(self.token_ms / 1000)
+                yield ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
+            chunk = AIMessageChunk(content="", tool_call_chunks=[
+                {"name": c["name"], "args": json.dumps(c["args"]), "id": c["id"], "index": i}
+                for i, c in enumerate(message.tool_calls)
+            ])
+            yield ChatGenerationChunk(message=chunk)
+            return
+        for word in message.content.split(" "):
+            await asyncio.sleep(self.token_ms / 1000)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+from fastapi.websockets import WebSocketState
+
+from app.agent.captions import CaptionEmitter
+
+
+class FlakySocket:
+    client_state = WebSocketState.CONNECTED
+
+    def __init__(self, fail_on=()):
+        self.fail_on = set(fail_on)
+        self.calls = 0
+        self.received = []
+
+    async def send_text(self, message):
+        self.calls += 1
+        if self.calls in self.fail_on:
+            raise ConnectionError("send failed")
+        self.received.append(json.loads(message))
+
+
+def _apply(shown, caption):
+    return shown[:caption["keep"]] + caption["append"]
+
+
+async def _push_all(emitter, texts):
+    for text in texts:
+        emitter.push(text)
+        await asyncio.sleep(0.01)  # let the send finish before the next partial
+
+
+def test_delta_captions_rebuild_the_text():
+    async def run():
+        socket = FlakySocket()
+        await _push_all(CaptionEmitter(socket, max_hz=0, delta=True), ["what", "what is", "what is the"])
+        return socket.received
+
+    received = asyncio.run(run())
+    assert received[1] == {"type": "asr_partial", "keep": 4, "append": " is"}
+    shown = ""
+    for caption in received:
+        shown = _apply(shown, caption)
+    assert shown == "what is the"
+
+
+def test_failed_send_is_followed_by_the_full_text():
+    async def run():
+        socket = FlakySocket(fail_on={2})
+        emitter = CaptionEmitter(socket, max_hz=0, delta=True)
+        await _push_all(emitter, ["what", "what is", "what is the"])
+        return socket.received
+
+    received = asyncio.run(run())
+    # "what is" never arrived, so the next caption cannot build on it
+    assert received == [
+        {"type": "asr_partial", "keep": 0, "append": "what"},
+        {"type": "asr_partial", "keep": 0, "append": "what is the"},
+    ]
+
+
+def test_reset_during_a_send_starts_the_next_caption_from_scratch():
+    async def run():
+        socket = FlakySocket()
+        emitter = CaptionEmitter(socket, max_hz=0, delta=True)
+        emitter.push("old turn")
+        emitter.reset()  # the send above is still in flight
+        await asyncio.sleep(0.01)
+        await _push_all(emitter, ["old"])
+        return socket.received
+
+    assert asyncio.run(run())[-1] == {"type": "asr_partial", "keep": 0, "append": "old"}
@@ -0,0 +1,106 @@
+import asyncio
+import json
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from app.agent import conversation_memory
+from app.agent.conversation_memory import (
+    compact_conversation, count_message_tokens, count_text_tokens, digest_tool_content,
+)
+
+BIG_RESULT = json.dumps({"status": "success", "tasks": [
+    {"id": i, "content": f"Task number {i}", "description": "x" * 80, "priority": 1}
+    for i in range(40)]})
+
+
+def _turn(i, tool_result=None):
+    messages = [HumanMessage(content=f"question {i}")]
+    if tool_result is not None:
+        messages += [
+            AIMessage(content="", tool_calls=[{"name": "get_tasks_of_the_user", "args": {}, "id": f"c{i}"}]),
+            ToolMessage(content=tool_result, name="get_tasks_of_the_user", tool_call_id=f"c{i}"),
+        ]
+    return messages + [AIMessage(content=f"answer {i}")]
+
+
+@pytest.fixture
+def summarized(monkeypatch):
+    evicted = []
+    monkeypatch.setattr(conversation_memory, "schedule_summary",
+                        lambda session, messages: evicted.extend(messages))
+    monkeypatch.setattr(conversation_memory.settings, "JARVIS_TOOL_DIGEST_CHARS", 600)
+    monkeypatch.setattr(conversation_memory.settings, "JARVIS_TOOL_DIGEST_KEEP_TURNS", 2)
+    return evicted
+
+
+def test_estimated_counts_without_tokenizer(monkeypatch):
+    monkeypatch.setattr(conversation_memory, "_encoding", None)
+    assert count_text_tokens("") == 0
+    assert count_text_tokens("x" * 40) == 11
+    call = AIMessage(content="", tool_calls=[{"name": "get_weather", "args": {"city": "Paris"}, "id": "c"}])
+    assert count_message_tokens(call) > count_message_tokens(AIMessage(content=""))
+
+
+def test_everything_fits_in_a_large_budget(summarized):
+    messages = [SystemMessage(content="prompt")] + _turn(1) + _turn(2)
+    kept = compact_conversation({}, messages, token_budget=10_000)
+    assert kept == messages[1:]  # the system prompt is rebuilt every turn
+    assert summarized == []
+
+
+def test_old_turns_go_to_the_summary(summarized):
+    turns = [_turn(i) for i in range(10)]
+    per_turn = sum(count_message_tokens(m) for m in turns[0])
+    kept = compact_conversation({}, [m for t in turns for m in t], token_budget=per_turn * 3)
+    assert kept == [m for t in turns[-3:] for m in t]
+    assert summarized == [m for t in turns[:7] for m in t]
+
+
+def test_latest_turn_is_kept_even_over_budget(summarized):
+    turns = [_turn(1), _turn(2, BIG_RESULT)]
+    kept = compact_conversation({}, [m for t in turns for m in t], token_budget=5)
+    assert kept[0].content == "question 2"
+    assert kept[2].content == BIG_RESULT
+    assert summarized == turns[0]
+
+
+def test_tool_results_are_digested_once_out_of_the_recent_turns(summarized):
+    turns = [_turn(1, BIG_RESULT), _turn(2, BIG_RESULT), _turn(3, BIG_RESULT)]
+    kept = compact_conversation({}, [m for t in turns for m in t], token_budget=100_000)
+    results = [m.content for m in kept if isinstance(m, ToolMessage)]
+    assert len(results[0]) <= 600 and results[0] != BIG_RESULT
+    assert results[1:] == [BIG_RESULT, BIG_RESULT]
+
+
+def test_recent_turn_falls_back_to_its_digest_before_being_dropped(summarized):
+    turns = [_turn(1, BIG_RESULT), _turn(2)]
+    full = sum(count_message_tokens(m) for m in [m for t in turns for m in t])
+    kept = compact_conversation({}, [m for t in turns for m in t], token_budget=full - 50)
+    assert [m.content for m in kept if isinstance(m, HumanMessage)] == ["question 1", "question 2"]
+    assert kept[2].content != BIG_RESULT
+    assert summarized == []
+
+
+def test_digest_keeps_counts_and_identifying_fields():
+    digest = json.loads(digest_tool_content(BIG_RESULT, 600))
+    assert digest["tasks"]["count"] == 40
+    assert digest["tasks"]["first"][0] == {"id": 0, "content": "Task number 0", "priority": 1}
+    assert digest_tool_content('{"ok": true}', 600) == '{"ok": true}'
+
+
+def test_summary_keeps_raw_lines_when_the_model_fails(monkeypatch):
+    def broken_client():
+        raise RuntimeError("no network")
+
+    monkeypatch.setattr(conversation_memory, "openai_client", broken_client)
+
+    async def run():
+        session = {"conversation_summary": "User asked about tasks."}
+        conversation_memory.schedule_summary(session, _turn(1))
+        await session["summary_task"]
+        return session
+
+    session = asyncio.run(run())
+    assert session["conversation_summary"] == "User asked about tasks. User: question 1 Jarvis: answer 1"
+    assert session["summary_backlog"] == []
@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from app.agent import fast_path
+from app.agent.fast_path import match_route, normalize, try_fast_path
+
+
+class FakeTool:
+    def __init__(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.calls = []
+
+    async def ainvoke(self, args):
+        self.calls.append(args)
+        if self.error:
+            raise self.error
+        return self.result
+
+
+def _route(transcript):
+    found = match_route(transcript)
+    return found[0] if found else None
+
+
+def test_normalize_strips_fillers_and_punctuation():
+    assert normalize("Hey Jarvis, can you tell me the time?") == "tell me the time"
+    assert normalize("OK jarvis what time is it please") == "what time is it"
+
+
+@pytest.mark.parametrize("transcript, route", [
+    ("What time is it?", "time"),
+    ("Jarvis, what's the time right now", "time"),
+    ("Go to standby.", "standby"),
+    ("stop listening", "standby"),
+    ("What are my tasks?", "pending_tasks"),
+    ("Please list all my open to dos", "pending_tasks"),
+    ("What do I still have to do?", "pending_tasks"),
+])
+def test_trivial_commands_match(transcript, route):
+    assert _route(transcript) == route
+
+
+@pytest.mark.parametrize("transcript", [
+    # the route has no date filter, so dated questions go to the LLM
+    "What are my tasks for today?",
+    "What are my tasks for tomorrow",
+    "What time is it in Tokyo?",
+    "Create a task to buy milk",
+    "What are my tasks in the work project",
+])
+def test_other_turns_fall_through(transcript):
+    assert _route(transcript) is None
+
+
+def test_pending_tasks_reply():
+    tool = FakeTool({"status": "success", "total": 7, "tasks": [
+        {"content": "Buy milk"}, {"content": "Call mom"}, {"content": "Pay rent"}]})
+    reply = asyncio.run(try_fast_path("what are my tasks", {"get_tasks_of_the_user": tool}))
+    assert tool.calls == [{"type": "pending", "limit": 5}]
+    assert reply["route"] == "pending_tasks"
+    assert reply["text"] == "You've got 7 pending tasks: Buy milk, Call mom, and Pay rent. There are 4 more."
+
+
+def test_time_reply_uses_local_time():
+    tool = FakeTool({"local_time": "2026-10-17 09:05:00", "utc_time": "2026-10-17 07:05:00 UTC"})
+    reply = asyncio.run(try_fast_path("what time is it", {"get_current_time": tool}))
+    assert reply["text"] == "It's 9:05 AM right now."
+
+
+def test_standby_reply_sets_the_flag():
+    tool = FakeTool({"spoken_response": "Going to standby."})
+    reply = asyncio.run(try_fast_path("go to sleep", {"send_to_standby": tool}))
+    assert reply == {"text": "Going to standby.", "standby": True, "route": "standby"}
+
+
+def test_failing_handler_falls_back_to_the_agent():
+    tools = {"get_tasks_of_the_user": FakeTool(error=RuntimeError("db down"))}
+    assert asyncio.run(try_fast_path("what are my tasks", tools)) is None
+    tools = {"get_tasks_of_the_user": FakeTool({"status": "error"})}
+    assert asyncio.run(try_fast_path("what are my tasks", tools)) is None
+
+
+def test_hits_and_misses_are_counted():
+    before = fast_path.stats()
+    asyncio.run(try_fast_path("create a task to buy milk", {}))
+    asyncio.run(try_fast_path("what time is it", {"get_current_time": FakeTool(
+        {"local_time": "2026-10-17 21:30:00"})}))
+    after = fast_path.stats()
+    assert after["misses"] == before["misses"] + 1
+    assert after["hits"] == before["hits"] + 1
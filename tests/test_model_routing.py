@@ -0,0 +1,97 @@
+import json
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from app.agent import model_routing
+from app.agent.model_routing import route
+
+ALL_TOOLS = None
+TASK_TOOLS = frozenset({"create_task", "update_task", "get_tasks_of_the_user"})
+
+
+def _after_tools(transcript, *results):
+    """Conversation right after the model's first tool round returned `results` (name, dict)."""
+    calls = [{"name": name, "args": {}, "id": f"call_{i}"} for i, (name, _) in enumerate(results)]
+    return [HumanMessage(content=transcript), AIMessage(content="", tool_calls=calls)] + [
+        ToolMessage(content=json.dumps(data), name=name, tool_call_id=f"call_{i}")
+        for i, (name, data) in enumerate(results)
+    ]
+
+
+@pytest.fixture(autouse=True)
+def cascade(monkeypatch):
+    monkeypatch.setattr(model_routing.settings, "JARVIS_MODEL_CASCADE_ENABLED", True)
+    monkeypatch.setattr(model_routing.settings, "JARVIS_POST_TOOL_TEMPLATES", True)
+    monkeypatch.setattr(model_routing.settings, "JARVIS_MODEL_ROUTE_POST_TOOL", "light")
+    monkeypatch.setattr(model_routing.settings, "JARVIS_MODEL_ROUTE_SMALLTALK", "light")
+    monkeypatch.setattr(model_routing.settings, "JARVIS_MODEL_ROUTE_PLANNING", "strong")
+
+
+@pytest.mark.parametrize("transcript", ["Hi Jarvis!", "thanks so much", "Good morning", "how are you today?"])
+def test_greetings_and_thanks_go_light(transcript):
+    assert route(transcript, [HumanMessage(content=transcript)], 0, ALL_TOOLS) == ("light", "smalltalk")
+
+
+@pytest.mark.parametrize("transcript", ["yes please do that", "ok", "sure go ahead", "no the other one"])
+def test_confirmations_and_unmatched_turns_get_the_default_model(transcript):
+    assert route(transcript, [HumanMessage(content=transcript)], 0, ALL_TOOLS) == ("default", "unmatched")
+
+
+def test_plain_tool_turn_gets_the_default_model():
+    assert route("add milk to my list", [], 0, TASK_TOOLS) == ("default", "default")
+
+
+def test_planning_and_long_turns_go_strong():
+    assert route("help me plan my whole week", [], 0, TASK_TOOLS) == ("strong", "planning")
+    assert route(" ".join(["word"] * 40), [], 0, TASK_TOOLS) == ("strong", "planning")
+    assert route("add milk and then remind me to call mom", [], 0, TASK_TOOLS) == ("strong", "planning")
+
+
+def test_final_lookup_result_is_verbalized_by_the_light_model():
+    messages = _after_tools("what's the weather in Paris", ("get_weather", {"temp": 18}))
+    assert route("what's the weather in Paris", messages, 1, frozenset({"get_weather"})) == ("light", "post_tool")
+
+
+def test_simple_write_confirmation_uses_a_template():
+    messages = _after_tools("add milk to my list",
+                            ("create_task", {"status": "success", "task": {"content": "milk"}}))
+    assert route("add milk to my list", messages, 1, TASK_TOOLS) == ("template", "post_tool_template")
+
+
+def test_lookup_before_a_write_keeps_the_default_model():
+    # the model looked the task up and still has to call update_task
+    transcript = "mark my dentist task as done"
+    messages = _after_tools(transcript, ("get_tasks_of_the_user", {"status": "success", "tasks": []}))
+    assert route(transcript, messages, 1, TASK_TOOLS) == ("default", "post_tool_continue")
+
+
+def test_multi_intent_turn_keeps_the_default_model_after_a_tool():
+    transcript = "add milk and also tell me the weather"
+    messages = _after_tools(transcript, ("create_task", {"status": "success", "task": {"content": "milk"}}))
+    assert route(transcript, messages, 1, TASK_TOOLS) == ("default", "post_tool_continue")
+
+
+def test_failed_tool_keeps_the_default_model():
+    messages = _after_tools("add milk", ("create_task", {"status": "error", "error": "db down"}))
+    assert route("add milk", messages, 1, TASK_TOOLS) == ("default", "post_tool_continue")
+
+
+def test_later_tool_rounds_keep_the_default_model():
+    messages = _after_tools("what's the weather", ("get_weather", {"temp": 18}))
+    assert route("what's the weather", messages, 2, frozenset({"get_weather"})) == ("default", "post_tool_continue")
+
+
+def test_too_many_calls_escalate():
+    messages = _after_tools("what's the weather", ("get_weather", {"temp": 18}))
+    assert route("what's the weather", messages, 4, frozenset({"get_weather"})) == ("strong", "many_steps")
+
+
+def test_cascade_off_always_uses_the_default_model(monkeypatch):
+    monkeypatch.setattr(model_routing.settings, "JARVIS_MODEL_CASCADE_ENABLED", False)
+    assert route("thanks", [], 0, ALL_TOOLS) == ("default", "cascade_off")
+
+
+def test_misconfigured_tier_falls_back_to_default(monkeypatch):
+    monkeypatch.setattr(model_routing.settings, "JARVIS_MODEL_ROUTE_SMALLTALK", "tiny")
+    assert route("hello", [], 0, ALL_TOOLS) == ("default", "smalltalk")
@@ -0,0 +1,179 @@
+import asyncio
+import time
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from app.core import session_registry
+from app.core.session_registry import RedisSessionRegistry
+
+
+def _registries(*worker_ids, ttl=90):
+    """Registries for several workers sharing one fake Redis server."""
+    server = fakeredis.FakeServer()
+    return [
+        RedisSessionRegistry(client=fakeredis.aioredis.FakeRedis(server=server, decode_responses=True),
+                             ttl=ttl, worker_id=worker_id)
+        for worker_id in worker_ids
+    ]
+
+
+async def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.01)
+
+
+def test_register_is_visible_to_other_workers_and_routes_the_user():
+    async def run():
+        a, b = _registries("worker-a", "worker-b")
+        await a.register("s1", 7, timezone="Europe/Berlin")
+
+        users = await b.connected_users()
+        assert users[7]["session_id"] == "s1"
+        assert users[7]["worker"] == "worker-a"
+        assert users[7]["timezone"] == "Europe/Berlin"
+        assert await b._redis.get(session_registry._user_key(7)) == "worker-a"
+
+        await a.close()
+        await b.close()
+
+    asyncio.run(run())
+
+
+def test_trigger_is_delivered_to_the_owning_worker():
+    async def run():
+        a, b = _registries("worker-a", "worker-b")
+        delivered = {"worker-a": [], "worker-b": []}
+        await a.start(lambda user_id, text: delivered["worker-a"].append((user_id, text)) or 1)
+        await b.start(lambda user_id, text: delivered["worker-b"].append((user_id, text)) or 1)
+        await a.register("s1", 7)
+
+        # publish returns 0 until worker-a's subscriber is listening
+        for _ in range(100):
+            if await b.send_trigger(7, "Tell me the weather"):
+                break
+            await asyncio.sleep(0.02)
+
+        await _wait_for(lambda: delivered["worker-a"])
+        assert delivered["worker-a"] == [(7, "Tell me the weather")]
+        assert delivered["worker-b"] == []
+        assert a.triggers_received == 1
+        assert await b.send_trigger(8, "nobody is connected") is False
+
+        await a.close()
+        await b.close()
+
+    asyncio.run(run())
+
+
+def test_sessions_expire_without_heartbeat(monkeypatch):
+    async def run():
+        a, b = _registries("worker-a", "worker-b", ttl=30)
+        await a.register("s1", 7)
+        assert 7 in await b.connected_users()
+
+        # the owning worker died: nothing refreshes the entry past its ttl
+        now = time.time()
+        monkeypatch.setattr(session_registry.time, "time", lambda: now + 31)
+        assert await b.connected_users() == {}
+        assert await b._redis.zcard(session_registry.SESSIONS_KEY) == 0
+
+        await b.close()
+
+    asyncio.run(run())
+
+
+def test_heartbeat_keeps_sessions_alive():
+    async def run():
+        a, b = _registries("worker-a", "worker-b", ttl=1)
+        await a.start(lambda user_id, text: 0)
+        await a.register("s1", 7)
+
+        # longer than the ttl; the heartbeat rewrites the entry every ttl / 3
+        await asyncio.sleep(1.5)
+        assert 7 in await b.connected_users()
+
+        await a.close()
+        assert await b.connected_users() == {}
+        await b.close()
+
+    asyncio.run(run())
+
+
+def test_unregister_keeps_a_route_owned_by_another_worker():
+    async def run():
+        a, b = _registries("worker-a", "worker-b")
+        await a.register("s1", 7)
+        # the user reconnected on worker-b: the route moves there
+        await b.register("s2", 7)
+        route = session_registry._user_key(7)
+
+        await a.unregister("s1")
+        assert await a._redis.get(route) == "worker-b"
+        assert await a._redis.exists(session_registry._session_key("s1")) == 0
+
+        await b.unregister("s2")
+        assert await b._redis.get(route) is None
+        assert await b.connected_users() == {}
+
+        await a.close()
+        await b.close()
+
+    asyncio.run(run())
+
+
+def test_scheduler_lock_is_held_by_one_worker():
+    async def run():
+        a, b = _registries("worker-a", "worker-b")
+        assert await a.acquire_scheduler_lock(55) is True
+        assert await b.acquire_scheduler_lock(55) is False
+        assert await a.acquire_scheduler_lock(55) is False
+        assert await b._redis.get(session_registry.SCHEDULER_LOCK_KEY) == "worker-a"
+
+        await b._redis.delete(session_registry.SCHEDULER_LOCK_KEY)
+        assert await b.acquire_scheduler_lock(55) is True
+
+        await a.close()
+        await b.close()
+
+    asyncio.run(run())
+
+
+def test_close_waits_for_background_tasks():
+    async def run():
+        (a,) = _registries("worker-a")
+        await a.start(lambda user_id, text: 0)
+        tasks = list(a._tasks)
+        await a.close()
+        assert all(task.done() for task in tasks)
+
+    asyncio.run(run())
+
+
+class _FakeTurns:
+    def __init__(self):
+        self.scheduled = []
+
+    def submit_scheduled(self, text):
+        self.scheduled.append(text)
+
+
+def test_trigger_runs_once_on_the_users_latest_session(monkeypatch):
+    from app.agent import websocket_handler
+
+    older, latest, other_user = _FakeTurns(), _FakeTurns(), _FakeTurns()
+    monkeypatch.setattr(websocket_handler, "session_memory", {
+        "tab-1": {"user_id": 7, "turns": older, "last_active": 10.0},
+        "tab-2": {"user_id": 7, "turns": latest, "last_active": 20.0},
+        "setup": {"user_id": 7, "last_active": 30.0},  # no scheduler yet
+        "other": {"user_id": 8, "turns": other_user, "last_active": 40.0},
+    })
+
+    assert websocket_handler.deliver_trigger(7, "Read my agenda") == 1
+    assert latest.scheduled == ["Read my agenda"]
+    assert older.scheduled == [] and other_user.scheduled == []
+    assert websocket_handler.deliver_trigger(9, "nobody") == 0
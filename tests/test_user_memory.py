@@ -0,0 +1,115 @@
+import pytest
+
+from app.agent import user_memory
+from app.agent.user_memory import is_duplicate, rank, similarity, top_facts
+
+
+@pytest.mark.parametrize("old, new", [
+    ("User's daughter's birthday is June 3", "User's son's birthday is June 3"),
+    ("meeting on Monday at 10", "meeting on Tuesday at 10"),
+    ("June 3", "June 30"),
+    ("User's dentist is Dr. Smith", "User's dentist is Dr. Smyth"),
+])
+def test_distinct_facts_are_not_duplicates(old, new):
+    assert not is_duplicate(old, new)
+
+
+@pytest.mark.parametrize("old, new", [
+    ("User's favourite colour is blue", "user's favourite colour is blue."),
+    ("User lives in St. Louis", "User lives in St Louis"),
+    ("User's wife is called Anna", "User's wife is called  Anna!"),
+])
+def test_restatements_are_duplicates(old, new):
+    assert is_duplicate(old, new)
+
+
+def test_similar_facts_score_high_but_stay_apart():
+    # trigram similarity alone would have merged these
+    old, new = "User's anniversary is on June 3", "User's anniversary is on June 30"
+    assert similarity(old, new) > 0.95
+    assert not is_duplicate(old, new)
+
+
+FACTS = [
+    (5, "User prefers tea over coffee"),
+    (4, "User's daughter Mia plays the violin"),
+    (3, "User works as a nurse at the city hospital"),
+    (2, "User's dog is called Rex"),
+    (1, "User is allergic to peanuts"),
+]
+
+
+def test_rank_puts_the_matching_fact_first():
+    scored = rank(FACTS, "what does my daughter play?")
+    assert scored[0][1] == (4, "User's daughter Mia plays the violin")
+
+
+def test_rank_matches_word_forms():
+    assert rank(FACTS, "does the user eat peanut butter")[0][1][0] == 1
+    assert rank(FACTS, "violins")[0][1][0] == 4
+    assert rank(FACTS, "where do I work")[0][1][0] == 3
+
+
+def test_rank_prefers_rarer_terms():
+    facts = [(1, "User likes coffee in the morning"), (2, "User likes hiking"),
+             (3, "User likes jazz")]
+    scored = rank(facts, "does the user like coffee")
+    assert scored[0][1][0] == 1
+
+
+def test_rank_returns_nothing_without_matches():
+    assert rank(FACTS, "quantum chromodynamics") == []
+    assert rank(FACTS, "the and of") == []
+    assert rank([], "tea") == []
+
+
+def test_top_facts_fills_with_most_recent():
+    picked = top_facts(FACTS, "violin", k=3)
+    assert picked[0] == "User's daughter Mia plays the violin"
+    assert picked[1:] == ["User prefers tea over coffee", "User works as a nurse at the city hospital"]
+    assert top_facts(FACTS, "violin", k=3, fill_recent=False) == ["User's daughter Mia plays the violin"]
+
+
+@pytest.fixture
+def db():
+    sqlalchemy = pytest.importorskip("sqlalchemy")
+    from sqlalchemy.orm import sessionmaker
+    # every model, so User's relationships resolve
+    from app.db.models import user, outlook_credentials, email, email_thread  # noqa: F401
+    from app.db.models.todo import project  # noqa: F401
+    from app.db.models.user import User
+    from app.db.models.user_info import UserInfo
+
+    engine = sqlalchemy.create_engine("sqlite://")
+    User.__table__.create(engine)
+    UserInfo.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(User(id=1, email="user@example.com"))
+    session.commit()
+    yield session
+    session.close()
+
+
+def test_save_fact_keeps_distinct_facts(db):
+    assert user_memory.save_fact(1, "User's daughter's birthday is June 3", db)["status"] == "saved"
+    assert user_memory.save_fact(1, "User's son's birthday is June 3", db)["status"] == "saved"
+    assert user_memory.save_fact(1, "meeting on Monday at 10", db)["status"] == "saved"
+    assert user_memory.save_fact(1, "meeting on Tuesday at 10", db)["status"] == "saved"
+    assert len(user_memory.read_facts(1, db)) == 4
+
+
+def test_save_fact_replaces_a_restatement(db):
+    first = user_memory.save_fact(1, "User's favourite colour is blue", db)
+    again = user_memory.save_fact(1, "user's favourite colour is blue.", db)
+    assert again == {"status": "updated", "id": first["id"], "evicted": 0}
+    assert user_memory.read_facts(1, db) == [(first["id"], "user's favourite colour is blue.")]
+
+
+def test_save_fact_evicts_the_least_recently_updated(db, monkeypatch):
+    monkeypatch.setattr(user_memory.settings, "JARVIS_MEMORY_MAX_FACTS", 2)
+    user_memory.save_fact(1, "User's dog is called Rex", db)
+    user_memory.save_fact(1, "User is allergic to peanuts", db)
+    result = user_memory.save_fact(1, "User prefers tea over coffee", db)
+    assert result["evicted"] == 1
+    assert [text for _, text in user_memory.read_facts(1, db)] == [
+        "User prefers tea over coffee", "User is allergic to peanuts"]